@@ -0,0 +1,264 @@
+"""
+Offline replay / load benchmark for the full bot pipeline.
+
+Replays recorded feed snapshots (benchmarks/snapshots/*.xml) through feed
+fetch, classification, DBManager, generate_alert_script, TTS and AudioQueue,
+with local stand-ins for HTTP, Supabase, OpenAI and ffmpeg (see standins.py).
+Reports throughput, detection-to-audio latency percentiles and memory.
+
+Usage:
+    python3 benchmarks/replay.py --duration 30 --poll-interval 1 --feeds 16
+    python3 benchmarks/replay.py --mode sequential --tts-latency 1.0
+    python3 benchmarks/replay.py --output results.json
+    python3 benchmarks/replay.py --baseline results.json --max-p95 5
+
+With --baseline or --max-p95 it exits non-zero on a regression, so it can
+gate a change.
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "../src"))
+sys.path.insert(0, BENCH_DIR)
+
+from metrics import HistogramChild
+from standins import FakeOpenAI, FeedServer, FifoDrain, LocalSupabase
+
+
+class LatencyRecorder(HistogramChild):
+    """Histogram that also keeps raw samples so percentiles are exact, not bucket bounds."""
+
+    def __init__(self):
+        super().__init__()
+        self.samples = []
+
+    def observe(self, seconds):
+        super().observe(seconds)
+        self.samples.append(seconds)
+
+    def percentile(self, q):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q / 100.0 * len(ordered)))]
+
+
+def configure(workdir, args):
+    """Points the shared config at throwaway files and installs the OpenAI stand-in."""
+    import config
+
+    api_path = os.path.join(workdir, "api_config.json")
+    stream_path = os.path.join(workdir, "stream_config.json")
+    with open(api_path, "w") as f:
+        json.dump({"openai_api_key": "sk-local-standin"}, f)
+    with open(stream_path, "w") as f:
+        json.dump({"tts_enabled": True}, f)
+    config.api_config = config.ConfigFile(api_path, schema=config.API_SCHEMA)
+    config.stream_config = config.ConfigFile(stream_path, defaults=config.STREAM_DEFAULTS, schema=config.STREAM_SCHEMA)
+
+    openai = FakeOpenAI(latency=args.tts_latency)
+    sys.modules["openai"] = openai
+    return openai
+
+
+def run_pipeline(db, audio_queue, recorder, args, end_window):
+    from pipeline import Pipeline
+
+    pipeline = Pipeline(db, poll_interval=args.poll_interval, audio_queue=audio_queue, queue_size=args.queue_size)
+    pipeline.histograms["end_to_end"] = recorder
+
+    async def run_for():
+        task = asyncio.create_task(pipeline.run())
+        await asyncio.sleep(args.duration)
+        # Throughput counts the replay window only, not the shutdown drain
+        end_window()
+        pipeline.stop()
+        await task
+
+    asyncio.run(run_for())
+    return {name: hist for name, hist in pipeline.histograms.items() if name != "end_to_end"}
+
+
+def run_sequential(db, audio_queue, recorder, args, end_window):
+    """The pre-pipeline main loop: everything in order, one poll at a time."""
+    from monitor import check_outages
+    from content_generator import generate_alert_script
+    from tts_generator import generate_tts
+
+    deadline = time.monotonic() + args.duration
+    audio_seq = 0
+    while time.monotonic() < deadline:
+        # check_outages fetches everything before returning, so detection = poll start
+        detected_at = time.monotonic()
+        updates = check_outages(db)
+        internet_status = db.get_internet_condition()
+        for update in updates:
+            alert_text = generate_alert_script(update["service"], update["title"], update["status"], internet_status)
+            db.insert_event(update["incident_id"], alert_text, event_type="alert")
+            path = generate_tts(alert_text, f"audio/alert_{audio_seq}.pcm")
+            audio_seq += 1
+            if path:
+                audio_queue.add_audio(path, delete_after=True)
+                recorder.observe(time.monotonic() - detected_at)
+        time.sleep(max(0.0, args.poll_interval - (time.monotonic() - detected_at)))
+    end_window()
+    return {}
+
+
+# result key -> (direction that counts as worse, label)
+CHECKS = {
+    "alerts_per_s": ("lower", "throughput"),
+    "latency_p95_s": ("higher", "p95 latency"),
+    "python_peak_mb": ("higher", "peak memory"),
+}
+
+
+def check_regressions(results, baseline=None, tolerance=0.2, max_p95=None):
+    """Returns a list of regressions against a baseline result and/or a p95 ceiling."""
+    problems = []
+    if max_p95 is not None and results["latency_p95_s"] > max_p95:
+        problems.append(f"p95 latency {results['latency_p95_s']}s exceeds --max-p95 {max_p95}s")
+    for key, (worse, label) in CHECKS.items():
+        if not baseline or key not in baseline:
+            continue
+        before, after = baseline[key], results[key]
+        if worse == "lower" and after < before * (1 - tolerance):
+            problems.append(f"{label} fell from {before} to {after} ({key})")
+        elif worse == "higher" and after > before * (1 + tolerance):
+            problems.append(f"{label} rose from {before} to {after} ({key})")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline replay / load benchmark")
+    parser.add_argument("--mode", choices=["pipeline", "sequential"], default="pipeline")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to replay")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between polls")
+    parser.add_argument("--feeds", type=int, default=4, help="Number of replayed feeds")
+    parser.add_argument("--rotate-seconds", type=float, default=None,
+                        help="How often feeds advance to the next snapshot (default: poll interval)")
+    parser.add_argument("--http-latency", type=float, default=0.05, help="Stand-in feed response delay")
+    parser.add_argument("--db-latency", type=float, default=0.02, help="Stand-in Supabase round-trip delay")
+    parser.add_argument("--tts-latency", type=float, default=0.3, help="Stand-in TTS request delay")
+    parser.add_argument("--queue-size", type=int, default=32)
+    parser.add_argument("--snapshots", default=os.path.join(BENCH_DIR, "snapshots"), help="Directory of *.xml feed snapshots")
+    parser.add_argument("--output", help="Also write results as JSON to this path")
+    parser.add_argument("--baseline", help="Results JSON from an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed relative change versus --baseline before it counts as a regression")
+    parser.add_argument("--max-p95", type=float, default=None, help="Fail if p95 detection-to-audio latency exceeds this many seconds")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    snapshots = []
+    for path in sorted(glob.glob(os.path.join(args.snapshots, "*.xml"))):
+        with open(path, "rb") as f:
+            snapshots.append(f.read())
+    if not snapshots:
+        parser.error(f"No *.xml snapshots in {args.snapshots}")
+
+    output_path = os.path.abspath(args.output) if args.output else None
+    workdir = tempfile.mkdtemp(prefix="outage-bot-bench-")
+    os.chdir(workdir)
+    os.makedirs("audio", exist_ok=True)
+
+    from log_setup import setup_logging
+    setup_logging(path=os.path.join(workdir, "bot.log"), console=False)
+    openai = configure(workdir, args)
+
+    from monitor import FEEDS
+    from db_manager import DBManager
+    from audio_queue import AudioQueue
+    from tts_generator import TTS_CACHE
+
+    server = FeedServer(snapshots, rotate_seconds=args.rotate_seconds or args.poll_interval, latency=args.http_latency)
+    FEEDS.clear()
+    FEEDS.update({f"Provider {i}": server.url(i) for i in range(args.feeds)})
+
+    supabase = LocalSupabase(latency=args.db_latency, providers=FEEDS.keys())
+    db = DBManager(client=supabase)
+
+    fifo_path = os.path.join(workdir, "audio", "live_audio.fifo")
+    audio_queue = AudioQueue(fifo_path=fifo_path)
+    drain = FifoDrain(fifo_path)
+
+    recorder = LatencyRecorder()
+    window = {}
+
+    def end_window():
+        window.update(seconds=time.perf_counter() - started, alerts=len(recorder.samples), db_requests=supabase.requests)
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    if args.mode == "pipeline":
+        stages = run_pipeline(db, audio_queue, recorder, args, end_window)
+    else:
+        stages = run_sequential(db, audio_queue, recorder, args, end_window)
+    elapsed = time.perf_counter() - started
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Let the writer finish its current chunk before the FIFO reader goes away
+    audio_queue.stop()
+    audio_queue.thread.join(timeout=2.0)
+    drain.stop()
+    server.close()
+
+    results = {
+        "mode": args.mode,
+        "duration_s": round(window["seconds"], 3),
+        "drain_s": round(elapsed - window["seconds"], 3),
+        "feeds": args.feeds,
+        "alerts_announced": len(recorder.samples),
+        "alerts_per_s": round(window["alerts"] / window["seconds"], 3),
+        "feed_bytes": server.bytes_served,
+        "db_requests": supabase.requests,
+        "db_requests_per_s": round(window["db_requests"] / window["seconds"], 3),
+        "incident_events": len(supabase.tables["incident_events"]),
+        "tts_requests": openai.calls,
+        "tts_cache_hits": int(TTS_CACHE.labels("hit").value),
+        "latency_p50_s": round(recorder.percentile(50), 4),
+        "latency_p90_s": round(recorder.percentile(90), 4),
+        "latency_p95_s": round(recorder.percentile(95), 4),
+        "latency_p99_s": round(recorder.percentile(99), 4),
+        "latency_max_s": round(max(recorder.samples, default=0.0), 4),
+        "python_peak_mb": round(peak_bytes / 1e6, 2),
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1e6 if sys.platform == "darwin" else 1e3), 2),
+        "stages": {name: hist.summary() for name, hist in stages.items()},
+    }
+
+    width = max(len(key) for key in results)
+    for key, value in results.items():
+        if key == "stages":
+            for name, summary in value.items():
+                print(f"{'stage ' + name:<{width}}  {summary}")
+        else:
+            print(f"{key:<{width}}  {value}")
+
+    if output_path:
+        with open(output_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+    problems = check_regressions(results, baseline, args.tolerance, args.max_p95)
+    for problem in problems:
+        print(f"REGRESSION: {problem}")
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""
+Local stand-ins for the bot's external services, for offline replay and benchmarks.
+
+- LocalSupabase: in-memory subset of the supabase-py query builder (and the
+                 rpc functions) used by DBManager.
+- FeedServer:    HTTP server replaying recorded feed snapshots.
+- FakeOpenAI:    module-shaped object exposing audio.speech.create().
+- FifoDrain:     reads the audio FIFO at real-time rate, like ffmpeg would.
+"""
+import os
+import threading
+import time
+import types
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+class _Response:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Query:
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.filters = []
+        self.ordering = []
+        self.row_limit = None
+        self.action = "select"
+        self.columns = None
+        self.values = None
+
+    def select(self, columns="*"):
+        self.action = "select"
+        self.columns = None if columns == "*" else [c.strip() for c in columns.split(",")]
+        return self
+
+    def insert(self, values):
+        self.action = "insert"
+        self.values = values
+        return self
+
+    def update(self, values):
+        self.action = "update"
+        self.values = values
+        return self
+
+    def delete(self):
+        self.action = "delete"
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def neq(self, column, value):
+        self.filters.append(lambda row: row.get(column) != value)
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row.get(column) >= value)
+        return self
+
+    def lt(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row.get(column) < value)
+        return self
+
+    def order(self, column, desc=False):
+        self.ordering.append((column, desc))
+        return self
+
+    def limit(self, count):
+        self.row_limit = count
+        return self
+
+    def execute(self):
+        return self.db._execute(self)
+
+
+class _Rpc:
+    def __init__(self, db, function, params):
+        self.db = db
+        self.function = function
+        self.params = params
+
+    def execute(self):
+        return self.db._call(self.function, self.params)
+
+
+class LocalSupabase:
+    """
+    Thread-safe in-memory tables with optional per-request latency.
+    "now()" values are replaced with the current timestamp, as Postgres would.
+    """
+
+    DEFAULTS = {
+        "incidents": {"active": True},
+        "incident_events": {},
+        "internet_conditions": {"status": "stable"},
+        "producer_events": {},
+        "providers": {},
+        "incident_event_summaries": {},
+    }
+
+    def __init__(self, latency=0.0, providers=()):
+        self.latency = latency
+        self.tables = {name: [] for name in self.DEFAULTS}
+        self.lock = threading.Lock()
+        self.requests = 0
+        for name in providers:
+            self.tables["providers"].append({"id": str(uuid.uuid4()), "name": name, "created_at": _now()})
+
+    def table(self, name):
+        return _Query(self, name)
+
+    def rpc(self, function, params=None):
+        return _Rpc(self, function, params or {})
+
+    def _call(self, function, params):
+        if self.latency:
+            time.sleep(self.latency)
+        with self.lock:
+            self.requests += 1
+            if function != "compact_incident_events":
+                raise ValueError(f"Unknown function: {function}")
+            return _Response(self._compact_incident_events(**params))
+
+    def _compact_incident_events(self, retention_days=7, batch_size=10000):
+        """Mirrors compact_incident_events() in retention_schema.sql."""
+        if retention_days < 1 or batch_size < 1:
+            raise ValueError("retention_days and batch_size must be at least 1")
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=retention_days)).isoformat()
+        events = self.tables["incident_events"]
+        doomed = sorted((e for e in events if e["created_at"] < cutoff), key=lambda e: e["created_at"])[:batch_size]
+        doomed_ids = {e["id"] for e in doomed}
+        self.tables["incident_events"] = [e for e in events if e["id"] not in doomed_ids]
+
+        summaries = {row["incident_id"]: row for row in self.tables["incident_event_summaries"]}
+        for event in doomed:
+            if not event.get("incident_id"):
+                continue
+            summary = summaries.setdefault(event["incident_id"], {
+                "incident_id": event["incident_id"], "event_count": 0, "alert_count": 0,
+                "first_event_at": event["created_at"], "last_event_at": event["created_at"], "last_description": None,
+            })
+            summary["event_count"] += 1
+            summary["alert_count"] += event.get("event_type") == "alert"
+            summary["first_event_at"] = min(summary["first_event_at"], event["created_at"])
+            if event["created_at"] >= summary["last_event_at"]:
+                summary["last_event_at"] = event["created_at"]
+                summary["last_description"] = event.get("description")
+        self.tables["incident_event_summaries"] = list(summaries.values())
+        return len(doomed)
+
+    def _prepare(self, table, values):
+        row = {"id": str(uuid.uuid4()), "created_at": _now(), **self.DEFAULTS.get(table, {})}
+        row.update({k: (_now() if v == "now()" else v) for k, v in values.items()})
+        if table == "internet_conditions":
+            row.setdefault("last_updated", row["created_at"])
+        return row
+
+    def _execute(self, query):
+        if self.latency:
+            time.sleep(self.latency)
+        with self.lock:
+            self.requests += 1
+            rows = self.tables.setdefault(query.table, [])
+            matched = [row for row in rows if all(f(row) for f in query.filters)]
+
+            if query.action == "insert":
+                values = query.values if isinstance(query.values, list) else [query.values]
+                inserted = [self._prepare(query.table, v) for v in values]
+                rows.extend(inserted)
+                return _Response([dict(r) for r in inserted])
+
+            if query.action == "update":
+                updates = {k: (_now() if v == "now()" else v) for k, v in query.values.items()}
+                for row in matched:
+                    row.update(updates)
+                return _Response([dict(r) for r in matched])
+
+            if query.action == "delete":
+                self.tables[query.table] = [row for row in rows if row not in matched]
+                return _Response([dict(r) for r in matched])
+
+            for column, desc in reversed(query.ordering):
+                matched.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+            if query.row_limit is not None:
+                matched = matched[:query.row_limit]
+            if query.columns:
+                matched = [{c: row.get(c) for c in query.columns} for row in matched]
+            return _Response([dict(r) for r in matched])
+
+
+class FeedServer:
+    """
+    Serves /feed/<n> from a list of recorded snapshots. The snapshot shown
+    advances every `rotate_seconds`, and feed n is offset by n so feeds differ.
+    """
+
+    def __init__(self, snapshots, rotate_seconds=1.0, latency=0.0):
+        self.snapshots = snapshots
+        self.rotate_seconds = rotate_seconds
+        self.latency = latency
+        self.started_at = time.monotonic()
+        self.bytes_served = 0
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                try:
+                    feed_index = int(self.path.rsplit("/", 1)[-1])
+                except ValueError:
+                    self.send_error(404)
+                    return
+                if standin.latency:
+                    time.sleep(standin.latency)
+                body = standin.current(feed_index)
+                standin.bytes_served += len(body)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/rss+xml")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def current(self, feed_index):
+        cycle = int((time.monotonic() - self.started_at) / self.rotate_seconds)
+        return self.snapshots[(cycle + feed_index) % len(self.snapshots)]
+
+    def url(self, feed_index):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}/feed/{feed_index}"
+
+    def close(self):
+        self.server.shutdown()
+
+
+class FakeOpenAI(types.ModuleType):
+    """Drop-in for the `openai` module: speech.create() sleeps, then writes silence."""
+
+    def __init__(self, latency=0.3, seconds_of_audio=2.0):
+        super().__init__("openai")
+        self.api_key = None
+        self.calls = 0
+        standin = self
+
+        class _Speech:
+            def create(self, model, voice, input, response_format="pcm"):
+                standin.calls += 1
+                time.sleep(latency)
+                data = b"\x00" * int(48000 * seconds_of_audio)
+                return types.SimpleNamespace(stream_to_file=lambda path: open(path, "wb").write(data))
+
+        self.audio = types.SimpleNamespace(speech=_Speech())
+
+
+class FifoDrain:
+    """Reads the audio FIFO at real time (24kHz 16-bit mono), standing in for ffmpeg."""
+
+    BYTES_PER_SEC = 48000
+
+    def __init__(self, fifo_path, chunk_size=4096):
+        self.fifo_path = fifo_path
+        self.chunk_size = chunk_size
+        self.bytes_read = 0
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while not os.path.exists(self.fifo_path):
+            time.sleep(0.01)
+        with open(self.fifo_path, "rb") as fifo:
+            while self.running:
+                data = fifo.read(self.chunk_size)
+                if not data:
+                    break
+                self.bytes_read += len(data)
+                time.sleep(len(data) / self.BYTES_PER_SEC)
+
+    def stop(self):
+        self.running = False
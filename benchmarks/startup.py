@@ -0,0 +1,110 @@
+"""
+Startup benchmark: cold import time per module and per-call config overhead.
+
+Usage:
+    python3 benchmarks/startup.py [--runs 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../src")
+sys.path.insert(0, SRC_DIR)
+
+MODULES = [
+    "config", "content_generator", "db_manager", "monitor", "tts_generator",
+    "streamer", "visualizer", "audio_queue", "pipeline", "main"
+]
+
+
+def parse_importtime(stderr):
+    """Returns [(cumulative_us, module)] from `python -X importtime` output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), name.strip()))
+    return rows
+
+
+def cold_import(module, runs):
+    """Imports `module` in a fresh interpreter `runs` times."""
+    wall = []
+    rows = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=SRC_DIR, capture_output=True, text=True
+        )
+        wall.append(time.perf_counter() - start)
+        if result.returncode != 0:
+            error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed"
+            return None, error, []
+        rows = parse_importtime(result.stderr)
+    return statistics.median(wall), None, rows
+
+
+def config_overhead(iterations):
+    """Compares re-parsing the JSON on every call with the shared ConfigFile."""
+    from config import ConfigFile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "api_config.json")
+        with open(path, "w") as f:
+            json.dump({"poll_interval_seconds": 300, "supabase_url": "http://localhost", "supabase_key": "x" * 200}, f)
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            with open(path) as f:
+                json.load(f)
+        reparse = (time.perf_counter() - start) / iterations
+
+        shared = ConfigFile(path)
+        start = time.perf_counter()
+        for _ in range(iterations):
+            shared.get()
+        cached = (time.perf_counter() - start) / iterations
+
+    return reparse, cached
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup / import-time benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per module")
+    parser.add_argument("--iterations", type=int, default=10000, help="Config loads per measurement")
+    args = parser.parse_args()
+
+    baseline, _, _ = cold_import("sys", args.runs)
+    print(f"Interpreter baseline: {baseline * 1000:.1f} ms\n")
+
+    print(f"{'module':<20} {'cold start (ms)':>16} {'import (ms)':>12}")
+    heaviest = []
+    for module in MODULES:
+        wall, error, rows = cold_import(module, args.runs)
+        if error:
+            print(f"{module:<20} {'unavailable':>16}   ({error})")
+            continue
+        own = next((us for us, name in reversed(rows) if name == module), 0)
+        print(f"{module:<20} {(wall - baseline) * 1000:>16.1f} {own / 1000:>12.1f}")
+        if module == "main":
+            heaviest = sorted(rows, reverse=True)[:10]
+
+    if heaviest:
+        print("\nHeaviest imports under `main`:")
+        for us, name in heaviest:
+            print(f"  {us / 1000:>8.1f} ms  {name}")
+
+    reparse, cached = config_overhead(args.iterations)
+    print(f"\nConfig per call: re-parse {reparse * 1e6:.1f} us, shared {cached * 1e6:.2f} us "
+          f"({reparse / cached:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+-- Indexes for the columns DBManager and the dashboards filter / order by
+
+-- DBManager.upsert_incident: lookup by provider + title among active incidents
+create index if not exists incidents_provider_title_active_idx
+  on public.incidents (provider_id, title, active);
+
+-- Dashboard initial load: active incidents ordered by last_update
+create index if not exists incidents_active_last_update_idx
+  on public.incidents (active, last_update desc);
+
+-- IncidentWatcher (fanout): last_update >= cursor
+create index if not exists incidents_last_update_idx
+  on public.incidents (last_update);
+
+-- Per-incident event history, and the retention sweep by age
+create index if not exists incident_events_incident_created_idx
+  on public.incident_events (incident_id, created_at);
+create index if not exists incident_events_created_idx
+  on public.incident_events (created_at);
+
+-- DBManager.get_internet_condition: latest row
+create index if not exists internet_conditions_last_updated_idx
+  on public.internet_conditions (last_updated desc);
+
+-- Producer event consumer: created_at >= cursor
+create index if not exists producer_events_created_idx
+  on public.producer_events (created_at, id);
+
+-- Rolled-up history for events past the retention window
+create table if not exists public.incident_event_summaries (
+  incident_id uuid primary key references public.incidents(id) on delete cascade,
+  event_count integer not null default 0,
+  alert_count integer not null default 0,
+  first_event_at timestamptz,
+  last_event_at timestamptz,
+  last_description text,
+  updated_at timestamptz default now()
+);
+
+-- Readable by dashboards; only compaction (service_role bypasses RLS) writes
+alter table public.incident_event_summaries enable row level security;
+drop policy if exists "Summaries are readable" on public.incident_event_summaries;
+create policy "Summaries are readable" on public.incident_event_summaries for select using (true);
+
+-- Moves up to batch_size events older than retention_days into
+-- incident_event_summaries and deletes them. Returns the number removed;
+-- call again until it returns less than batch_size. Only the bot's
+-- service_role may call it (see the grants below).
+create or replace function public.compact_incident_events(retention_days integer default 7, batch_size integer default 10000)
+returns integer
+language plpgsql
+as $$
+declare
+  removed integer;
+begin
+  if retention_days is null or retention_days < 1 then
+    raise exception 'retention_days must be at least 1, got %', retention_days;
+  end if;
+  if batch_size is null or batch_size < 1 then
+    raise exception 'batch_size must be at least 1, got %', batch_size;
+  end if;
+
+  with doomed as (
+    delete from public.incident_events
+    where id in (
+      select id from public.incident_events
+      where created_at < now() - make_interval(days => retention_days)
+      order by created_at
+      limit batch_size
+    )
+    returning incident_id, event_type, description, created_at
+  ),
+  rolled as (
+    select incident_id,
+           count(*) as event_count,
+           count(*) filter (where event_type = 'alert') as alert_count,
+           min(created_at) as first_event_at,
+           max(created_at) as last_event_at,
+           (array_agg(description order by created_at desc))[1] as last_description
+    from doomed
+    where incident_id is not null
+    group by incident_id
+  ),
+  upserted as (
+    insert into public.incident_event_summaries as s
+      (incident_id, event_count, alert_count, first_event_at, last_event_at, last_description)
+    select incident_id, event_count, alert_count, first_event_at, last_event_at, last_description
+    from rolled
+    on conflict (incident_id) do update set
+      event_count = s.event_count + excluded.event_count,
+      alert_count = s.alert_count + excluded.alert_count,
+      first_event_at = least(s.first_event_at, excluded.first_event_at),
+      last_event_at = greatest(s.last_event_at, excluded.last_event_at),
+      last_description = case
+        when excluded.last_event_at >= coalesce(s.last_event_at, excluded.last_event_at) then excluded.last_description
+        else s.last_description
+      end,
+      updated_at = now()
+    returning 1
+  )
+  select count(*) into removed from doomed;
+  return removed;
+end;
+$$;
+
+-- Functions in public are executable by anon by default, and the anon key
+-- ships to browsers: keep deletion of history to the bot's service role.
+revoke execute on function public.compact_incident_events(integer, integer) from public, anon, authenticated;
+grant execute on function public.compact_incident_events(integer, integer) to service_role;
@@ -37,6 +37,7 @@ def run_migration():
     
     print("Skipping DDL execution (Client limitation).")
     print("Please go to Supabase SQL Editor and run the content of `schema.sql` (lines 72+).")
+    print("Then run `retention_schema.sql` for the indexes and the incident event compaction function.")
 
 if __name__ == "__main__":
     run_migration()
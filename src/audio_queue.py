@@ -2,7 +2,14 @@ import os
 import time
 import logging
 import threading
+import metrics
 
+QUEUE_DEPTH = metrics.gauge("audio_queue_depth", "Clips waiting to be played")
+UNDERRUNS = metrics.counter("audio_underruns_total", "Writer gaps long enough to starve the FIFO")
+BYTES_WRITTEN = metrics.counter("audio_fifo_bytes_total", "PCM bytes written to the FIFO", ["kind"])
+
+# A gap between FIFO writes longer than this means ffmpeg may have run dry.
+UNDERRUN_THRESHOLD = 0.25
 
 class AudioQueue:
     def __init__(self, fifo_path="audio/live_audio.fifo"):
@@ -10,6 +17,8 @@ class AudioQueue:
         self.lock = threading.Lock()
         self.running = True
         self.queue = [] # Queue of audio file paths to play
+        self.playing = False
+        QUEUE_DEPTH.set_function(lambda: len(self.queue))
         self._ensure_fifo()
         
         # Start the writer thread
@@ -28,15 +37,29 @@ class AudioQueue:
             except OSError as e:
                 logging.error(f"Failed to create FIFO: {e}")
 
-    def add_audio(self, file_path):
-        """Adds an audio file to the playback queue."""
+    def add_audio(self, file_path, priority=False, delete_after=False):
+        """
+        Adds an audio file to the playback queue. Priority audio jumps ahead of
+        regular clips but stays in order with other priority clips.
+        With `delete_after`, the file is removed once played (or discarded on stop).
+        """
         if os.path.exists(file_path):
             with self.lock:
-                self.queue.append(file_path)
-            logging.info(f"Queued audio: {file_path}")
+                if priority:
+                    position = sum(1 for _, _, queued_priority in self.queue if queued_priority)
+                    self.queue.insert(position, (file_path, delete_after, True))
+                else:
+                    self.queue.append((file_path, delete_after, False))
+            logging.info(f"Queued audio: {file_path}", extra={"path": file_path, "priority": priority})
         else:
             logging.error(f"Audio file not found: {file_path}")
 
+    def _discard(self, file_path):
+        try:
+            os.remove(file_path)
+        except OSError as e:
+            logging.error(f"Error removing played clip {file_path}: {e}")
+
     def _writer_loop(self):
         """Continuously writes audio or silence to the FIFO."""
         logging.info("Audio writer loop started.")
@@ -57,20 +80,36 @@ class AudioQueue:
             logging.error(f"Error opening FIFO: {e}")
             return
 
+        self._last_write = time.monotonic()
         while self.running:
             current_audio = None
             
             with self.lock:
                 if self.queue:
                     current_audio = self.queue.pop(0)
+                    self.playing = True
             
             if current_audio:
-                self._stream_file(fifo, current_audio)
+                file_path, delete_after, _ = current_audio
+                self._stream_file(fifo, file_path)
+                if delete_after:
+                    self._discard(file_path)
+                with self.lock:
+                    self.playing = False
             else:
                 self._stream_silence(fifo)
 
         fifo.close()
 
+    def _write(self, fifo, data, kind):
+        """Writes one chunk, flagging an underrun if the previous write was too long ago."""
+        if time.monotonic() - self._last_write > UNDERRUN_THRESHOLD:
+            UNDERRUNS.inc()
+        fifo.write(data)
+        fifo.flush()
+        self._last_write = time.monotonic()
+        BYTES_WRITTEN.labels(kind).inc(len(data))
+
     def _stream_file(self, fifo, file_path):
         """Reads a raw PCM file and writes its data to the FIFO."""
         try:
@@ -79,15 +118,13 @@ class AudioQueue:
                 data = f.read(chunk_size)
                 while data:
                     try:
-                        fifo.write(data)
-                        fifo.flush()
+                        self._write(fifo, data, "audio")
                     except BrokenPipeError:
                         logging.warning("FIFO broken pipe. Re-opening...")
                         return 
                     data = f.read(chunk_size)
             
-            message = f"Finished playing: {os.path.basename(file_path)}"
-            logging.info(message)
+            logging.info(f"Finished playing: {os.path.basename(file_path)}", extra={"path": file_path})
             
         except Exception as e:
             logging.error(f"Error streaming file {file_path}: {e}")
@@ -111,10 +148,9 @@ class AudioQueue:
             while written < total_bytes:
                 to_write = min(chunk_size, total_bytes - written)
                 if to_write < chunk_size:
-                    fifo.write(b'\x00' * to_write)
+                    self._write(fifo, b'\x00' * to_write, "silence")
                 else:
-                    fifo.write(silence_chunk)
-                fifo.flush()
+                    self._write(fifo, silence_chunk, "silence")
                 written += to_write
                 # slightly sleep to approximate real-time if needed, 
                 # but for silence usually we can just fill the buffer.
@@ -124,5 +160,24 @@ class AudioQueue:
         except BrokenPipeError:
             pass
 
+    def wait_until_played(self, timeout):
+        """
+        Blocks until every queued clip has been played, or `timeout` seconds pass.
+        Returns True if the queue emptied in time.
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline and self.thread.is_alive():
+            with self.lock:
+                if not self.queue and not self.playing:
+                    return True
+            time.sleep(0.1)
+        return False
+
     def stop(self):
         self.running = False
+        with self.lock:
+            pending, self.queue = self.queue, []
+        for file_path, delete_after, _ in pending:
+            if delete_after:
+                self._discard(file_path)
+
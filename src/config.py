@@ -0,0 +1,147 @@
+import json
+import logging
+import os
+import threading
+import time
+
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../config")
+API_CONFIG_PATH = os.path.join(CONFIG_DIR, "api_config.json")
+STREAM_CONFIG_PATH = os.path.join(CONFIG_DIR, "stream_config.json")
+
+STREAM_DEFAULTS = {
+    "video_width": 1280, "video_height": 720,
+    "overlay_width": 800, "overlay_height": 220,
+    "overlay_x": 240, "overlay_y": 460
+}
+
+# key -> (expected types, must be positive)
+API_SCHEMA = {
+    "poll_interval_seconds": ((int, float), True),
+    "pipeline_queue_size": (int, True),
+    "producer_poll_interval_seconds": ((int, float), True),
+    "event_retention_days": (int, True),
+    "compaction_interval_seconds": ((int, float), True),
+    "metrics_port": (int, False),
+    "fanout_port": (int, False),
+    "fanout_host": (str, False),
+    "incident_poll_interval_seconds": ((int, float), True),
+    "supabase_url": (str, False),
+    "supabase_key": (str, False),
+    "openai_api_key": (str, False),
+    "youtube_stream_key": (str, False),
+    "youtube_stream_url": (str, False),
+}
+
+STREAM_SCHEMA = {
+    "video_width": (int, True),
+    "video_height": (int, True),
+    "overlay_width": (int, True),
+    "overlay_height": (int, True),
+    "overlay_x": (int, False),
+    "overlay_y": (int, False),
+    "tts_enabled": (bool, False),
+    "tts_voice": (str, False),
+    "tts_model": (str, False),
+    "background_video_path": (str, False),
+    "outputs": (list, False),
+    "encoder_auto_tune": (bool, False),
+}
+
+
+def validate(config, schema):
+    """Returns a list of problems for known keys. Unknown keys are allowed."""
+    problems = []
+    for key, (types, positive) in schema.items():
+        if key not in config:
+            continue
+        value = config[key]
+        if not isinstance(value, types) or (isinstance(value, bool) and types is not bool):
+            problems.append(f"'{key}' has invalid type {type(value).__name__}")
+        elif positive and value <= 0:
+            problems.append(f"'{key}' must be positive")
+    return problems
+
+
+class ConfigFile:
+    """
+    A JSON config file parsed once and shared by every module.
+
+    The file's mtime is re-checked at most every `check_interval` seconds;
+    when it changes the file is re-parsed and re-validated. A reload that
+    fails keeps the last good config.
+    """
+
+    def __init__(self, path, defaults=None, schema=None, check_interval=1.0):
+        self.path = path
+        self.defaults = defaults or {}
+        self.schema = schema or {}
+        self.check_interval = check_interval
+        self.lock = threading.Lock()
+        self._data = None
+        self._mtime = None
+        self._checked_at = 0.0
+
+    def get(self):
+        """Returns the current config dict. Treat it as read-only."""
+        now = time.monotonic()
+        if self._data is not None and now - self._checked_at < self.check_interval:
+            return self._data
+
+        with self.lock:
+            self._checked_at = now
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError:
+                mtime = None
+            if self._data is None or mtime != self._mtime:
+                self._reload(mtime)
+            return self._data
+
+    def _reload(self, mtime):
+        self._mtime = mtime
+        if mtime is None:
+            if self._data is None:
+                logging.error(f"Config file not found: {self.path}")
+                self._data = dict(self.defaults)
+            return
+
+        try:
+            with open(self.path) as f:
+                loaded = json.load(f)
+        except Exception as e:
+            logging.error(f"Error loading config {self.path}: {e}")
+            if self._data is None:
+                self._data = dict(self.defaults)
+            return
+
+        problems = validate(loaded, self.schema)
+        if problems:
+            logging.error(f"Invalid config {self.path}: {'; '.join(problems)}")
+            if self._data is not None:
+                return
+            # No previous config to fall back to: drop the bad keys
+            loaded = {k: v for k, v in loaded.items() if not validate({k: v}, self.schema)}
+
+        if self._data is not None:
+            logging.info(f"Reloaded config {self.path}")
+        self._data = {**self.defaults, **loaded}
+
+    def invalidate(self):
+        """Forces a re-read on the next get()."""
+        with self.lock:
+            self._mtime = None
+            self._checked_at = 0.0
+
+
+api_config = ConfigFile(API_CONFIG_PATH, schema=API_SCHEMA)
+stream_config = ConfigFile(STREAM_CONFIG_PATH, defaults=STREAM_DEFAULTS, schema=STREAM_SCHEMA)
+
+
+def load_config():
+    """Shared, cached contents of config/api_config.json."""
+    return api_config.get()
+
+
+def load_stream_config():
+    """Shared, cached contents of config/stream_config.json."""
+    return stream_config.get()
@@ -1,12 +1,4 @@
-import openai
-import json
-import os
-
-def load_config():
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    config_path = os.path.join(current_dir, "../config/api_config.json")
-    with open(config_path) as f:
-        return json.load(f)
+import random
 
 def generate_alert_script(service: str, title: str, status: str, internet_status: str = "stable") -> str:
     """
@@ -14,6 +6,9 @@ def generate_alert_script(service: str, title: str, status: str, internet_status
     Includes context if internet is unstable.
     """
     
+    if status == "Resolved":
+        return f"Service restored for {service}. {title}."
+
     # Base Outage Script
     base_script = f"Service outage detected for {service}. {title}."
     
@@ -29,7 +24,6 @@ def generate_alert_script(service: str, title: str, status: str, internet_status
         "Stand by for updates.",
         "Engineering teams are investigating."
     ]
-    import random
     return f"{base_script} {random.choice(endings)}"
 
 def generate_script(outage_report):
@@ -1,17 +1,25 @@
-import os
-import json
 import logging
-from supabase import create_client, Client
+import metrics
+from config import load_config
+
+DB_SECONDS = metrics.histogram("db_call_seconds", "DBManager method latency", ["method"])
+DB_ROUND_TRIPS = metrics.counter("db_round_trips_total", "Supabase requests issued", ["method"])
+DB_ERRORS = metrics.counter("db_errors_total", "Supabase requests that raised", ["method"])
 
 class DBManager:
-    def __init__(self):
-        self.config = self._load_config()
+    def __init__(self, client=None):
+        """Connects using config/api_config.json, unless a ready client (or stand-in) is passed."""
+        self.config = load_config()
         self.url = self.config.get("supabase_url")
         self.key = self.config.get("supabase_key")
-        self.client: Client = None
+        self.client = client
         
+        if client is not None:
+            return
+
         if self.url and self.key:
             try:
+                from supabase import create_client  # deferred: slow import
                 self.client = create_client(self.url, self.key)
                 logging.info("Connected to Supabase.")
             except Exception as e:
@@ -19,20 +27,20 @@ class DBManager:
         else:
             logging.warning("Supabase URL/Key not found in config.")
 
-    def _load_config(self):
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        config_path = os.path.join(current_dir, "../config/api_config.json")
+    def _execute(self, query, method):
+        """Runs a query builder, counting the round trip against `method`."""
+        DB_ROUND_TRIPS.labels(method).inc()
         try:
-            with open(config_path) as f:
-                return json.load(f)
-        except Exception as e:
-            logging.error(f"Error loading config: {e}")
-            return {}
+            return query.execute()
+        except Exception:
+            DB_ERRORS.labels(method).inc()
+            raise
 
+    @metrics.timed(DB_SECONDS, "get_provider_id")
     def get_provider_id(self, provider_name):
         if not self.client: return None
         try:
-            response = self.client.table("providers").select("id").eq("name", provider_name).execute()
+            response = self._execute(self.client.table("providers").select("id").eq("name", provider_name), "get_provider_id")
             if response.data:
                 return response.data[0]['id']
             else:
@@ -42,6 +50,19 @@ class DBManager:
             logging.error(f"Error fetching provider ID: {e}")
             return None
 
+    @metrics.timed(DB_SECONDS, "get_provider_name")
+    def get_provider_name(self, provider_id):
+        if not self.client or not provider_id: return None
+        try:
+            response = self._execute(self.client.table("providers").select("name").eq("id", provider_id), "get_provider_name")
+            if response.data:
+                return response.data[0]['name']
+            return None
+        except Exception as e:
+            logging.error(f"Error fetching provider name: {e}")
+            return None
+
+    @metrics.timed(DB_SECONDS, "upsert_incident")
     def upsert_incident(self, provider_name, title, status, severity="minor", url=None, raw_text=None, start_time=None):
         """
         Upserts an incident based on (provider_id, title) or similar logic.
@@ -56,7 +77,7 @@ class DBManager:
 
         try:
             # Check for existing active incident with same title
-            existing = self.client.table("incidents").select("id").eq("provider_id", provider_id).eq("title", title).eq("active", True).execute()
+            existing = self._execute(self.client.table("incidents").select("id").eq("provider_id", provider_id).eq("title", title).eq("active", True), "upsert_incident")
             
             data = {
                 "provider_id": provider_id,
@@ -73,13 +94,13 @@ class DBManager:
             if existing.data:
                 # Update
                 incident_id = existing.data[0]['id']
-                self.client.table("incidents").update(data).eq("id", incident_id).execute()
+                self._execute(self.client.table("incidents").update(data).eq("id", incident_id), "upsert_incident")
                 return incident_id
             else:
                 # Insert
                 if not start_time:
                     data["start_time"] = "now()"
-                response = self.client.table("incidents").insert(data).execute()
+                response = self._execute(self.client.table("incidents").insert(data), "upsert_incident")
                 if response.data:
                     return response.data[0]['id']
                 return None
@@ -87,6 +108,7 @@ class DBManager:
             logging.error(f"Error upserting incident: {e}")
             return None
 
+    @metrics.timed(DB_SECONDS, "insert_event")
     def insert_event(self, incident_id, description, event_type="update"):
         if not self.client or not incident_id: return
         try:
@@ -95,21 +117,108 @@ class DBManager:
                 "description": description,
                 "event_type": event_type
             }
-            self.client.table("incident_events").insert(data).execute()
-            logging.info(f"Logged event for incident {incident_id}: {event_type}")
+            self._execute(self.client.table("incident_events").insert(data), "insert_event")
+            logging.info(f"Logged event for incident {incident_id}: {event_type}", extra={"incident_id": incident_id, "event_type": event_type})
         except Exception as e:
             logging.error(f"Error inserting event: {e}")
 
+    @metrics.timed(DB_SECONDS, "get_active_incidents")
+    def get_active_incidents(self):
+        """Active incidents with provider names, newest first (same shape the dashboard loads)."""
+        if not self.client: return []
+        try:
+            response = self._execute(self.client.table("incidents").select("id,title,status,severity,url,last_update,active,providers(name)").eq("active", True).order("last_update", desc=True), "get_active_incidents")
+            return response.data or []
+        except Exception as e:
+            logging.error(f"Error fetching active incidents: {e}")
+            return []
+
+    @metrics.timed(DB_SECONDS, "get_updated_incidents")
+    def get_updated_incidents(self, since=None, limit=200):
+        """
+        Incidents with last_update >= since, oldest first, in the same shape as
+        get_active_incidents (inactive ones included).
+        """
+        if not self.client: return []
+        try:
+            query = self.client.table("incidents").select("id,title,status,severity,url,last_update,active,providers(name)")
+            if since:
+                query = query.gte("last_update", since)
+            response = self._execute(query.order("last_update").limit(limit), "get_updated_incidents")
+            return response.data or []
+        except Exception as e:
+            logging.error(f"Error fetching updated incidents: {e}")
+            return []
+
+    @metrics.timed(DB_SECONDS, "get_latest_incident_update")
+    def get_latest_incident_update(self):
+        """Returns the newest incidents.last_update, or None."""
+        if not self.client: return None
+        try:
+            response = self._execute(self.client.table("incidents").select("last_update").order("last_update", desc=True).limit(1), "get_latest_incident_update")
+            if response.data:
+                return response.data[0]["last_update"]
+            return None
+        except Exception as e:
+            logging.error(f"Error fetching latest incident update: {e}")
+            return None
+
+    @metrics.timed(DB_SECONDS, "get_internet_condition")
     def get_internet_condition(self):
         """Fetches the current internet condition status."""
         if not self.client: return "stable"
         
         try:
             # Get latest row
-            response = self.client.table("internet_conditions").select("status").order("last_updated", desc=True).limit(1).execute()
+            response = self._execute(self.client.table("internet_conditions").select("status").order("last_updated", desc=True).limit(1), "get_internet_condition")
             if response.data and len(response.data) > 0:
                 return response.data[0]["status"]
             return "stable"
         except Exception as e:
             logging.error(f"Error fetching internet condition: {e}")
             return "stable"
+
+    @metrics.timed(DB_SECONDS, "get_producer_events")
+    def get_producer_events(self, since=None, limit=50):
+        """
+        Fetches producer_events with created_at >= since, oldest first.
+        The boundary row is included; callers de-duplicate by id.
+        """
+        if not self.client: return []
+        try:
+            query = self.client.table("producer_events").select("id,type,payload,created_at")
+            if since:
+                query = query.gte("created_at", since)
+            response = self._execute(query.order("created_at").order("id").limit(limit), "get_producer_events")
+            return response.data or []
+        except Exception as e:
+            logging.error(f"Error fetching producer events: {e}")
+            return []
+
+    @metrics.timed(DB_SECONDS, "get_latest_producer_event")
+    def get_latest_producer_event(self):
+        """Returns the most recent producer_events row, or None."""
+        if not self.client: return None
+        try:
+            response = self._execute(self.client.table("producer_events").select("id,created_at").order("created_at", desc=True).limit(1), "get_latest_producer_event")
+            if response.data:
+                return response.data[0]
+            return None
+        except Exception as e:
+            logging.error(f"Error fetching latest producer event: {e}")
+            return None
+
+    @metrics.timed(DB_SECONDS, "compact_events")
+    def compact_events(self, retention_days=7, batch_size=10000):
+        """
+        Rolls up to `batch_size` incident_events older than `retention_days`
+        into incident_event_summaries and deletes them (compact_incident_events
+        in retention_schema.sql). Returns the number of events removed.
+        """
+        if not self.client: return 0
+        try:
+            response = self._execute(self.client.rpc("compact_incident_events", {"retention_days": retention_days, "batch_size": batch_size}), "compact_events")
+            return response.data or 0
+        except Exception as e:
+            logging.error(f"Error compacting incident events: {e}")
+            return 0
@@ -1,9 +1,9 @@
 import json
 import os
+from config import API_CONFIG_PATH, API_SCHEMA, validate
 
 def check_config():
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    config_path = os.path.join(current_dir, "../config/api_config.json")
+    config_path = API_CONFIG_PATH
     
     print(f"Checking config at: {config_path}")
     
@@ -16,6 +16,9 @@ def check_config():
             config = json.load(f)
             
         print("Config file loaded successfully.")
+
+        for problem in validate(config, API_SCHEMA):
+            print(f"ERROR: {problem}.")
         
         # Check OpenAI Key
         openai_key = config.get("openai_api_key")
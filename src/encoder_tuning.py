@@ -0,0 +1,183 @@
+import hashlib
+import json
+import logging
+import os
+import platform
+import subprocess
+import time
+
+from config import CONFIG_DIR, load_stream_config
+from streamer import FFMPEG_PROGRESS, composite_filter, encode_args
+
+PROFILE_PATH = os.path.join(CONFIG_DIR, "encoder_profile.json")
+CACHE_DIR = "assets/cache"
+
+PRESETS = ["veryfast", "superfast", "ultrafast"]
+# Shorter-side sizes (720p, 480p, 360p) tried below the configured size
+STEP_DOWN_SIZES = [720, 480, 360]
+
+FPS = 25
+GOP = 50  # 2s keyframe interval at 25fps, as YouTube recommends
+TARGET_SPEED = 1.3  # must beat real time by 30% to leave headroom for the rest of the bot
+BENCH_SECONDS = 5
+
+
+def _host_signature():
+    return {"cpu_count": os.cpu_count(), "machine": platform.machine(), "node": platform.node()}
+
+
+def _video_size(stream_config):
+    return stream_config.get("video_width", 1280), stream_config.get("video_height", 720)
+
+
+def build_candidates(width, height):
+    """
+    (preset, width, height) candidates, best quality first: the configured size,
+    then smaller sizes with the same aspect ratio. The smallest size only gets
+    the fastest preset, as a last resort.
+    """
+    short_side = min(width, height)
+    scales = [1.0] + [size / short_side for size in STEP_DOWN_SIZES if size < short_side]
+    candidates = []
+    for i, scale in enumerate(scales):
+        w, h = [int(round(v * scale / 2)) * 2 for v in (width, height)]
+        presets = PRESETS[-1:] if i == len(scales) - 1 and i > 0 else PRESETS
+        candidates.extend((preset, w, h) for preset in presets)
+    return candidates
+
+
+def prepare_background(source, width, height, fps=FPS, gop=GOP):
+    """
+    Transcodes the background loop once to the output size, frame rate and
+    keyframe interval, so the live encode needs no per-frame scaling.
+    Returns the cached path (or the source if ffmpeg fails).
+    """
+    try:
+        stat = os.stat(source)
+    except OSError as e:
+        logging.error(f"Background video not found: {e}")
+        return source
+
+    key = hashlib.sha1(f"{os.path.abspath(source)}:{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()[:12]
+    name = os.path.splitext(os.path.basename(source))[0]
+    target = os.path.join(CACHE_DIR, f"{name}_{width}x{height}_{fps}fps_g{gop}_{key}.mp4")
+    if os.path.exists(target):
+        return target
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_target = target + ".tmp.mp4"
+    cmd = [
+        "ffmpeg", "-y", "-loglevel", "error", "-i", source,
+        "-vf", f"scale={width}:{height},fps={fps}",
+        "-an", "-c:v", "libx264", "-preset", "medium", "-crf", "18", "-pix_fmt", "yuv420p",
+        "-g", str(gop), "-keyint_min", str(gop), "-sc_threshold", "0",
+        tmp_target
+    ]
+    logging.info(f"Pre-scaling background to {width}x{height}...")
+    try:
+        subprocess.run(cmd, check=True, capture_output=True)
+        os.replace(tmp_target, target)
+        return target
+    except (OSError, subprocess.CalledProcessError) as e:
+        logging.error(f"Failed to pre-scale background: {e}")
+        return source
+
+
+def measure_speed(background, image_path, stream_config, profile, seconds=BENCH_SECONDS):
+    """Encodes `seconds` of the composite as fast as possible. Returns speed (1.0 = real time)."""
+    cmd = [
+        "ffmpeg", "-y", "-nostdin",
+        "-stream_loop", "-1", "-i", background,
+        "-loop", "1", "-i", image_path,
+        "-f", "lavfi", "-i", "anullsrc=channel_layout=stereo:sample_rate=44100",
+        "-filter_complex", composite_filter(stream_config, profile),
+        "-map", "[outv]", "-map", "2:a",
+        *encode_args(profile),
+        "-t", str(seconds), "-f", "null", "-"
+    ]
+    start = time.perf_counter()
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "ffmpeg failed")
+
+    # Prefer ffmpeg's own figure; fall back to wall time (includes startup, so conservative)
+    matches = FFMPEG_PROGRESS.findall(result.stderr)
+    if matches:
+        return float(matches[-1][1])
+    return seconds / elapsed
+
+
+def calibrate(image_path="dashboard.png", candidates=None, target_speed=TARGET_SPEED):
+    """
+    Benchmarks candidate presets/resolutions (by default derived from the
+    configured video size) and returns the first (best quality) profile that
+    encodes at least `target_speed` times real time. Falls back to the fastest
+    candidate if none do.
+    """
+    stream_config = load_stream_config()
+    source = stream_config.get("background_video_path", "assets/yall_bot_idle.mp4")
+    if candidates is None:
+        candidates = build_candidates(*_video_size(stream_config))
+
+    profile = None
+    for preset, width, height in candidates:
+        background = prepare_background(source, width, height)
+        candidate = {"preset": preset, "width": width, "height": height, "fps": FPS, "gop": GOP,
+                     "background_path": background, "prescaled": background != source}
+        try:
+            speed = measure_speed(background, image_path, stream_config, candidate)
+        except (OSError, RuntimeError) as e:
+            logging.error(f"Calibration run failed for {preset} {width}x{height}: {e}")
+            continue
+        candidate["speed"] = round(speed, 2)
+        logging.info(f"Calibration: {preset} {width}x{height} -> {speed:.2f}x")
+        profile = candidate
+        if speed >= target_speed:
+            return profile
+
+    if profile:
+        logging.warning(f"No encoder profile reached {target_speed}x; using the fastest candidate.")
+    return profile
+
+
+def load_or_calibrate(image_path="dashboard.png", force=False):
+    """
+    Returns the cached encoder profile for this host and video size, calibrating
+    first if there is none or either changed. Returns None if calibration could not run.
+    """
+    host = _host_signature()
+    stream_config = load_stream_config()
+    video_size = list(_video_size(stream_config))
+    if not force:
+        try:
+            with open(PROFILE_PATH) as f:
+                cached = json.load(f)
+            if cached.get("host") == host and cached.get("video_size") == video_size:
+                profile = cached["profile"]
+                # Re-derive the asset: a no-op unless the source video changed or the cache was cleared
+                source = stream_config.get("background_video_path", "assets/yall_bot_idle.mp4")
+                profile["background_path"] = prepare_background(source, profile["width"], profile["height"])
+                profile["prescaled"] = profile["background_path"] != source
+                logging.info(f"Using cached encoder profile: {profile['preset']} {profile['width']}x{profile['height']} ({profile.get('speed')}x)")
+                return profile
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.error(f"Error loading encoder profile: {e}")
+
+    logging.info("Calibrating encoder (one-time per host)...")
+    profile = calibrate(image_path)
+    if profile:
+        try:
+            with open(PROFILE_PATH, "w") as f:
+                json.dump({"host": host, "video_size": video_size, "profile": profile, "calibrated_at": time.time()}, f, indent=2)
+        except OSError as e:
+            logging.error(f"Error saving encoder profile: {e}")
+        logging.info(f"Selected encoder profile: {profile['preset']} {profile['width']}x{profile['height']}")
+    return profile
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(load_or_calibrate(force=True))
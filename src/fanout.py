@@ -0,0 +1,292 @@
+import asyncio
+import json
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from urllib.parse import parse_qs, urlparse
+
+import metrics
+from config import load_config
+
+HEARTBEAT_SECONDS = 15
+BUFFER_SIZE = 1000
+
+CLIENTS = metrics.gauge("fanout_clients", "Connected SSE dashboard clients")
+EVENTS = metrics.counter("fanout_events_total", "Events published to dashboards", ["type"])
+
+# Same priorities as web-dashboard/src/lib/classifyEvent.ts (1 = highest).
+# Bot captions are INCIDENT_UPDATE events too, but at CAPTION_PRIORITY, as
+# classifyEvent.ts gives incident_events rows.
+PRIORITIES = {
+    "MANUAL_ANNOUNCE": 1,
+    "INCIDENT_NEW": 2,
+    "INCIDENT_RESOLVED": 3,
+    "INCIDENT_UPDATE": 4,
+    "CONTEXT_CHANGE": 5,
+}
+CAPTION_PRIORITY = 3
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+class EventHub:
+    """
+    Pre-classified event stream plus current state, shared by all dashboards.
+
+    Every event gets a sequence number. Recent events are kept in a ring
+    buffer so a reconnecting client can resume from its last sequence number;
+    clients too far behind (or new ones) get a full snapshot instead.
+    Incident rows use the same shape as Supabase's incidents + providers(name),
+    so the dashboard's existing mappers apply unchanged.
+    """
+
+    def __init__(self, buffer_size=BUFFER_SIZE):
+        self.cond = threading.Condition()
+        self.seq = 0
+        self.events = deque(maxlen=buffer_size)
+        self.incidents = {}
+        self.internet_status = "stable"
+
+    def load_snapshot(self, incident_rows, internet_status="stable"):
+        with self.cond:
+            self.incidents = {row["id"]: row for row in incident_rows}
+            self.internet_status = internet_status
+
+    def snapshot(self):
+        with self.cond:
+            return {
+                "seq": self.seq,
+                "incidents": sorted(self.incidents.values(), key=lambda r: r.get("last_update") or "", reverse=True),
+                "internet_status": self.internet_status,
+            }
+
+    def since(self, seq):
+        """Events after `seq`, or None if they are no longer buffered."""
+        with self.cond:
+            if seq > self.seq:
+                return None
+            if seq == self.seq:
+                return []
+            if not self.events or self.events[0]["seq"] > seq + 1:
+                return None
+            return [event for event in self.events if event["seq"] > seq]
+
+    def wait(self, seq, timeout):
+        """Blocks until an event newer than `seq` exists or `timeout` passes."""
+        with self.cond:
+            self.cond.wait_for(lambda: self.seq > seq, timeout)
+            return self.seq
+
+    def publish(self, event_type, caption, subtitle=None, incident=None, priority=None):
+        with self.cond:
+            self.seq += 1
+            event = {
+                "seq": self.seq,
+                "id": f"fanout-{self.seq}",
+                "type": event_type,
+                "priority": priority or PRIORITIES[event_type],
+                "caption": caption,
+                "timestamp": _now(),
+            }
+            if subtitle:
+                event["subtitle"] = subtitle
+            if incident:
+                event["incident"] = incident
+            self.events.append(event)
+            self.cond.notify_all()
+        EVENTS.labels(event_type).inc()
+        return event
+
+    # --- Domain helpers used by the pipeline ---
+
+    def incident_changed(self, incident, incident_id):
+        """Applies an incident the pipeline just persisted (see apply_incident)."""
+        return self.apply_incident({
+            "id": incident_id,
+            "title": incident["title"],
+            "status": incident["status"],
+            "severity": incident["severity"],
+            "url": incident.get("url"),
+            "last_update": _now(),
+            "active": True,
+            "providers": {"name": incident["service"]},
+        })
+
+    def apply_incident(self, row):
+        """
+        Stores an incident row and publishes NEW/UPDATE/RESOLVED, only when its
+        status, severity or active flag actually changed. Inactive rows leave
+        the snapshot.
+        """
+        with self.cond:
+            previous = self.incidents.get(row["id"])
+            if row.get("active", True):
+                self.incidents[row["id"]] = row
+            else:
+                self.incidents.pop(row["id"], None)
+            if previous and _incident_state(previous) == _incident_state(row):
+                return None
+            if previous is None and not row.get("active", True):
+                return None
+
+        service = (row.get("providers") or {}).get("name") or "Service"
+        if row.get("status") == "Resolved" or not row.get("active", True):
+            return self.publish("INCIDENT_RESOLVED", f"Service restored: {row['title']}",
+                                f"{service} is now operational", incident=row)
+        if previous is None:
+            return self.publish("INCIDENT_NEW", f"New outage: {row['title']}", service, incident=row)
+        return self.publish("INCIDENT_UPDATE", f"Update: {row['title']}", row.get("status"), incident=row)
+
+    def caption(self, text):
+        """Bot-generated alert script (what incident_events carries)."""
+        return self.publish("INCIDENT_UPDATE", text, priority=CAPTION_PRIORITY)
+
+    def announce(self, text):
+        return self.publish("MANUAL_ANNOUNCE", text, "Manual announcement")
+
+    def context(self, status, description=None):
+        with self.cond:
+            if status == self.internet_status:
+                return None
+            self.internet_status = status
+        if status == "unstable":
+            return self.publish("CONTEXT_CHANGE", "Internet instability detected", description or "Monitoring conditions")
+        return None
+
+
+def _incident_state(row):
+    return row.get("status"), row.get("severity"), row.get("active", True)
+
+
+class IncidentWatcher:
+    """
+    The bot's one poll on `incidents`, so the hub also sees changes the bot
+    did not make itself: incidents injected from the producer page, or edited
+    by hand. Rows are read by last_update (set by DBManager and the producer
+    page); rows the bot already applied come back unchanged and are ignored.
+
+    Create it before loading the hub snapshot, so nothing changed in between
+    is missed. Runs as a pipeline source.
+    """
+
+    def __init__(self, db, hub, poll_interval=2.0, batch_size=200):
+        self.db = db
+        self.hub = hub
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.cursor = self.db.get_latest_incident_update()
+
+    def poll_once(self):
+        """Applies incidents updated since the cursor. Returns how many rows were read."""
+        rows = self.db.get_updated_incidents(since=self.cursor, limit=self.batch_size)
+        for row in rows:
+            self.hub.apply_incident(row)
+            if row.get("last_update") and (self.cursor is None or row["last_update"] > self.cursor):
+                self.cursor = row["last_update"]
+        return len(rows)
+
+    async def run(self, pipeline):
+        logging.info("Incident watcher started.")
+        while True:
+            try:
+                await asyncio.to_thread(self.poll_once)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Error watching incidents: {e}")
+            await asyncio.sleep(load_config().get("incident_poll_interval_seconds", self.poll_interval))
+
+
+def _sse(event_name, seq, data):
+    return f"id: {seq}\nevent: {event_name}\ndata: {json.dumps(data, default=str)}\n\n".encode("utf-8")
+
+
+def _fanout_handler(hub):
+    from http.server import BaseHTTPRequestHandler
+
+    class FanoutHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/snapshot":
+                body = json.dumps(self.hub.snapshot(), default=str).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Access-Control-Allow-Origin", "*")
+                self.end_headers()
+                self.wfile.write(body)
+            elif url.path == "/events":
+                self._stream(url)
+            else:
+                self.send_error(404)
+
+        def _resume_point(self, url):
+            # EventSource sends Last-Event-ID on reconnect; ?since= lets other clients resume too
+            value = self.headers.get("Last-Event-ID") or parse_qs(url.query).get("since", [None])[0]
+            try:
+                return int(value) if value is not None else None
+            except ValueError:
+                return None
+
+        def _stream(self, url):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.end_headers()
+
+            CLIENTS.inc()
+            try:
+                last = self._resume_point(url)
+                pending = self.hub.since(last) if last is not None else None
+                if pending is None:
+                    snapshot = self.hub.snapshot()
+                    self.wfile.write(_sse("snapshot", snapshot["seq"], snapshot))
+                    last = snapshot["seq"]
+                    pending = self.hub.since(last) or []
+
+                while True:
+                    for event in pending:
+                        self.wfile.write(_sse("delta", event["seq"], event))
+                        last = event["seq"]
+                    if not pending:
+                        self.wfile.write(b": ping\n\n")
+                    self.wfile.flush()
+
+                    self.hub.wait(last, HEARTBEAT_SECONDS)
+                    pending = self.hub.since(last)
+                    if pending is None:
+                        # Fell out of the buffer while we were writing: resync
+                        snapshot = self.hub.snapshot()
+                        self.wfile.write(_sse("snapshot", snapshot["seq"], snapshot))
+                        last = snapshot["seq"]
+                        pending = []
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            finally:
+                CLIENTS.dec()
+
+        def log_message(self, format, *args):
+            pass
+
+    FanoutHandler.hub = hub
+    return FanoutHandler
+
+
+def start_fanout_server(hub, port=9109, host="127.0.0.1"):
+    """Serves /events (SSE) and /snapshot for dashboards from a daemon thread."""
+    # deferred: http.server is slow to import and main imports us unconditionally
+    from http.server import ThreadingHTTPServer
+
+    try:
+        server = ThreadingHTTPServer((host, port), _fanout_handler(hub))
+    except OSError as e:
+        logging.error(f"Failed to start fanout server on {host}:{port}: {e}")
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logging.info(f"Dashboard event stream at http://{host}:{port}/events")
+    return server
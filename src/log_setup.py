@@ -0,0 +1,124 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+from datetime import datetime, timezone
+
+import metrics
+
+LOG_PATH = "bot.log"
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+LOG_QUEUE_SIZE = 10000
+
+# (module, message prefix) -> keep 1 in N. Only applies below WARNING.
+SAMPLE_RULES = {
+    ("audio_queue", "Queued audio"): 10,
+    ("audio_queue", "Finished playing"): 10,
+    ("db_manager", "Logged event"): 10,
+}
+
+DROPPED = metrics.counter("log_records_dropped_total", "Log records dropped", ["reason"])
+
+# Attributes every LogRecord has; anything else came in through `extra=`.
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; fields passed via `extra=` are kept as keys."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "module": record.module,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps 1 in N records for chatty (module, message prefix) pairs."""
+
+    def __init__(self, rules):
+        super().__init__()
+        self.rules = rules
+        self.counts = {key: 0 for key in rules}
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        for key, every in self.rules.items():
+            module, prefix = key
+            if record.module == module and isinstance(record.msg, str) and record.msg.startswith(prefix):
+                self.counts[key] += 1
+                if (self.counts[key] - 1) % every:
+                    DROPPED.labels("sampled").inc()
+                    return False
+                record.sampled_every = every
+                return True
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full."""
+
+    def prepare(self, record):
+        # The stock prepare() formats in the caller's thread and clears exc_info,
+        # which folds tracebacks into "msg". Pass the record through as-is; the
+        # listener's handlers format it.
+        return copy.copy(record)
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DROPPED.labels("queue_full").inc()
+
+
+def setup_logging(path=LOG_PATH, level=logging.INFO, max_bytes=LOG_MAX_BYTES,
+                  backup_count=LOG_BACKUP_COUNT, sample_rules=SAMPLE_RULES, console=True):
+    """
+    Routes the root logger through a queue so callers never wait on disk I/O.
+    A background listener writes JSON lines to a size-rotated file and
+    human-readable lines to the console. Returns the listener.
+    """
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+
+    file_handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count)
+    file_handler.setFormatter(JsonFormatter())
+
+    handlers = [file_handler]
+    if console:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        handlers.append(console_handler)
+
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(sample_rules))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener.start()
+    atexit.register(_stop_listener, listener)
+    return listener
+
+
+def _stop_listener(listener):
+    # Callers may already have stopped it; QueueListener.stop() fails on a second call
+    if listener._thread is not None:
+        listener.stop()
@@ -1,36 +1,35 @@
-import time
-import json
-import os
-from monitor import check_outages
-from content_generator import generate_alert_script
+import asyncio
+from config import load_config, load_stream_config
 from db_manager import DBManager
+from pipeline import Pipeline
+from producer_consumer import ProducerEventConsumer
+from retention import EventCompactor
+from audio_queue import AudioQueue
+from streamer import start_stream
+from encoder_tuning import load_or_calibrate
+from metrics import start_metrics_server
+from fanout import EventHub, IncidentWatcher, start_fanout_server
+from log_setup import setup_logging
 import argparse
 import logging
 
-import logging
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("bot.log"),
-        logging.StreamHandler()
-    ]
-)
-
-def load_config():
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    config_path = os.path.join(current_dir, "../config/api_config.json")
-    with open(config_path) as f:
-        return json.load(f)
+# Seconds to keep streaming on shutdown so already-synthesized alerts are heard
+AUDIO_DRAIN_TIMEOUT = 30
 
 def main():
     parser = argparse.ArgumentParser(description="Tech Outage Bot 2.1")
-    parser.add_argument("--dry-run", action="store_true", help="Stream to local file dry_run.flv instead of YouTube")
+    parser.add_argument("--stream", action="store_true", help="Stream to YouTube with TTS announcements")
+    parser.add_argument("--dry-run", action="store_true", help="Stream to local file dry_run.mp4 instead of YouTube")
     parser.add_argument("--local-preview", action="store_true", help="Stream to local file preview.flv")
+    parser.add_argument("--output", action="append", dest="outputs", metavar="TARGET",
+                        help="Add a stream sink (RTMP URL, file path or 'youtube'); repeat for several sinks sharing one encode")
+    parser.add_argument("--recalibrate", action="store_true", help="Re-run the encoder speed calibration before streaming")
     args = parser.parse_args()
 
+    # Logging goes through a queue; a background thread does the disk I/O.
+    # The listener is flushed and stopped at exit.
+    setup_logging()
+
     local_output = None
     if args.dry_run:
         local_output = "dry_run.mp4"
@@ -41,51 +40,67 @@ def main():
     config = load_config()
     poll_interval = config.get("poll_interval_seconds", 300)
     
+    # Local /metrics endpoint (set metrics_port to 0 to disable)
+    metrics_port = config.get("metrics_port", 9108)
+    if metrics_port:
+        start_metrics_server(metrics_port)
+
     # Initialize DB 
     db = DBManager()
-    
-    try:
-        while True:
-            logging.info("--- Starting Polling Loop ---")
-            
-            # 1. Check for outages
-            try:
-                # Assuming check_outages() performs scraping and Upserting to DB
-                # Ideally check_outages(db) is better, but following existing pattern:
-                updates = check_outages() 
-                logging.info(f"Processed feeds. Found {len(updates)} significant updates.")
-                
-                # Fetch Context
-                internet_status = db.get_internet_condition()
-                logging.info(f"Context: Internet is {internet_status}")
 
-                # 2. Process Updates
-                for update in updates:
-                    service = update['service']
-                    title = update['title']
-                    status = update['status']
-                    incident_id = update['incident_id']
-                    
-                    logging.info(f"Processing Alert: {service} - {title}")
-                    
-                    # Generate Context-Aware Script
-                    alert_text = generate_alert_script(service, title, status, internet_status)
-                    logging.info(f"Generated Script: {alert_text}")
+    # Dashboards subscribe here instead of each holding their own DB subscription
+    hub = None
+    sources = []
+    fanout_port = config.get("fanout_port", 9109)
+    if fanout_port:
+        hub = EventHub()
+        # Watcher first: its cursor predates the snapshot, so nothing in between is lost
+        sources.append(IncidentWatcher(db, hub, poll_interval=config.get("incident_poll_interval_seconds", 2.0)))
+        hub.load_snapshot(db.get_active_incidents(), db.get_internet_condition())
+        start_fanout_server(hub, fanout_port, config.get("fanout_host", "127.0.0.1"))
+
+    # Audio/stream path is only wired up when we are actually streaming
+    audio_queue = None
+    stream_process = None
+    if args.stream or local_output or args.outputs:
+        # Pick preset/resolution that keeps ffmpeg ahead of real time on this host
+        profile = None
+        if load_stream_config().get("encoder_auto_tune", True):
+            profile = load_or_calibrate(force=args.recalibrate)
+        audio_queue = AudioQueue()
+        stream_process = start_stream(local_output=local_output, outputs=args.outputs, profile=profile)
 
-                    # Insert Event into DB (Triggers Frontend Animation)
-                    db.insert_event(incident_id, alert_text, event_type="alert")
-                    
-                    # Audio generation removed for V1 (Frontend TTS future)
-                    
-            except Exception as e:
-                logging.error(f"Error in polling loop: {e}")
+    # Manual injections from the producer dashboard
+    producer_consumer = ProducerEventConsumer(
+        db,
+        poll_interval=config.get("producer_poll_interval_seconds", 1.0)
+    )
 
-            # Wait for next poll
-            logging.info(f"Sleeping for {poll_interval} seconds...")
-            time.sleep(poll_interval)
+    # Roll up and delete old incident_events so history stays bounded
+    compactor = EventCompactor(
+        db,
+        retention_days=config.get("event_retention_days", 7),
+        interval=config.get("compaction_interval_seconds", 3600)
+    )
 
-    except KeyboardInterrupt:
+    pipeline = Pipeline(
+        db,
+        poll_interval=poll_interval,
+        audio_queue=audio_queue,
+        queue_size=config.get("pipeline_queue_size", 32),
+        sources=sources + [producer_consumer, compactor],
+        hub=hub
+    )
+
+    try:
+        asyncio.run(pipeline.run())
+    finally:
         logging.info("Stopping bot...")
+        if audio_queue:
+            # Play what the pipeline drained before ffmpeg goes away
+            if not audio_queue.wait_until_played(timeout=AUDIO_DRAIN_TIMEOUT):
+                logging.warning(f"Audio queue not played out within {AUDIO_DRAIN_TIMEOUT}s, discarding the rest.")
+            audio_queue.stop()
         if stream_process:
             stream_process.terminate()
         logging.info("Goodbye!")
@@ -0,0 +1,257 @@
+import bisect
+import functools
+import logging
+import threading
+import time
+
+# Latency buckets in seconds, shared by every histogram unless overridden.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class CounterChild:
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def samples(self):
+        yield "", {}, self.value
+
+
+class GaugeChild:
+    def __init__(self):
+        self.value = 0.0
+        self._function = None
+
+    def set(self, value):
+        self.value = value
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def dec(self, amount=1):
+        self.value -= amount
+
+    def set_function(self, function):
+        """Reads the value from `function` at scrape time (e.g. a queue length)."""
+        self._function = function
+
+    def get(self):
+        if self._function:
+            try:
+                return self._function()
+            except Exception:
+                return float("nan")
+        return self.value
+
+    def samples(self):
+        yield "", {}, self.get()
+
+
+class HistogramChild:
+    """Fixed-bucket histogram. Observing is a bisect and three additions."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def time(self):
+        """Context manager / decorator that observes elapsed seconds."""
+        return Timer(self)
+
+    def percentile(self, q):
+        """Returns the upper bound of the bucket holding the q-th percentile."""
+        if not self.count:
+            return 0.0
+        rank = q / 100.0 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return float("inf")
+
+    def summary(self):
+        if not self.count:
+            return "no samples"
+        mean = self.total / self.count
+        return (f"n={self.count} mean={mean * 1000:.1f}ms "
+                f"p50<={self.percentile(50)}s p95<={self.percentile(95)}s p99<={self.percentile(99)}s")
+
+    def samples(self):
+        cumulative = 0
+        for bound, n in zip(self.buckets, self.counts):
+            cumulative += n
+            yield "_bucket", {"le": _format_value(bound)}, cumulative
+        yield "_bucket", {"le": "+Inf"}, self.count
+        yield "_sum", {}, self.total
+        yield "_count", {}, self.count
+
+
+class Timer:
+    """Observes elapsed wall time into a histogram; usable as `with` or as a decorator."""
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self._start)
+        return False
+
+    def __call__(self, function):
+        histogram = self.histogram
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start)
+        return wrapper
+
+
+class MetricFamily:
+    """A named metric with optional labels. Children are created on first use."""
+
+    child_types = {"counter": CounterChild, "gauge": GaugeChild, "histogram": HistogramChild}
+
+    def __init__(self, name, documentation, kind, labelnames=(), **child_kwargs):
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self._child_kwargs = child_kwargs
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            with self._lock:
+                child = self._children.setdefault(key, self.child_types[self.kind](**self._child_kwargs))
+        return child
+
+    def __getattr__(self, attr):
+        # Unlabelled metrics behave like their single child (metric.inc(), metric.observe(), ...)
+        if attr.startswith("_") or self.__dict__.get("labelnames", True):
+            raise AttributeError(attr)
+        return getattr(self.labels(), attr)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in list(self._children.items()):
+            base = dict(zip(self.labelnames, key))
+            for suffix, extra, value in child.samples():
+                labels = {**base, **extra}
+                label_text = ""
+                if labels:
+                    label_text = "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+                lines.append(f"{self.name}{suffix}{label_text} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, name, documentation, kind, labelnames, **child_kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = MetricFamily(name, documentation, kind, labelnames, **child_kwargs)
+                self._metrics[name] = metric
+            elif metric.kind != kind:
+                raise ValueError(f"Metric {name} already registered as {metric.kind}")
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._get_or_create(name, documentation, "counter", labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._get_or_create(name, documentation, "gauge", labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(name, documentation, "histogram", labelnames, buckets=buckets)
+
+    def render(self):
+        return "\n".join(metric.render() for metric in list(self._metrics.values())) + "\n"
+
+
+REGISTRY = Registry()
+counter = REGISTRY.counter
+gauge = REGISTRY.gauge
+histogram = REGISTRY.histogram
+
+
+def timed(metric, *label_values):
+    """Decorator: observes the wrapped function's duration into `metric`."""
+    child = metric.labels(*label_values)
+    return Timer(child)
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _metrics_handler(registry):
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Scrapes are frequent; keep them out of bot.log
+            pass
+
+    return MetricsHandler
+
+
+def start_metrics_server(port=9108, host="127.0.0.1"):
+    """Serves GET /metrics from a daemon thread. Returns the server (or None on failure)."""
+    # deferred: http.server is slow to import and every instrumented module imports us
+    from http.server import ThreadingHTTPServer
+
+    try:
+        server = ThreadingHTTPServer((host, port), _metrics_handler(REGISTRY))
+    except OSError as e:
+        logging.error(f"Failed to start metrics server on {host}:{port}: {e}")
+        return None
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    logging.info(f"Metrics available at http://{host}:{port}/metrics")
+    return server
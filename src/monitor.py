@@ -1,5 +1,7 @@
+import logging
+import time
+import metrics
 from db_manager import DBManager
-import feedparser
 
 # List of RSS feeds to monitor
 FEEDS = {
@@ -9,65 +11,112 @@ FEEDS = {
     "PyPI": "https://status.python.org/history.rss"
 }
 
-def check_outages():
+FETCH_SECONDS = metrics.histogram("feed_fetch_seconds", "HTTP download time per feed", ["feed"])
+FETCH_BYTES = metrics.counter("feed_fetch_bytes_total", "Bytes downloaded per feed", ["feed"])
+PARSE_SECONDS = metrics.histogram("feed_parse_seconds", "feedparser time per feed", ["feed"])
+FETCH_ERRORS = metrics.counter("feed_fetch_errors_total", "Failed feed fetches", ["feed"])
+
+def fetch_feed(service, url):
+    """
+    Downloads and parses a single feed.
+    Returns the top 3 entries (the only ones we inspect for active issues).
+    """
+    # deferred: slow imports, only needed when polling
+    import feedparser
+    import requests
+
+    start = time.perf_counter()
+    try:
+        response = requests.get(url, timeout=15)
+        response.raise_for_status()
+    except Exception:
+        FETCH_ERRORS.labels(service).inc()
+        raise
+    finally:
+        FETCH_SECONDS.labels(service).observe(time.perf_counter() - start)
+    FETCH_BYTES.labels(service).inc(len(response.content))
+
+    with PARSE_SECONDS.labels(service).time():
+        feed = feedparser.parse(response.content)
+    return feed.entries[:3]
+
+def classify_entry(service, entry):
+    """
+    Turns a raw feed entry into an incident dict ready for the DB.
+    Returns None if the entry is not worth ingesting.
+    """
+    # Simple heuristic: if title implies "resolved" or "normal", maybe skip or mark resolved?
+    # For v1, we ingest everything that looks like an incident.
+
+    title = entry.title
+    link = entry.link
+    summary = entry.get("summary", "")
+
+    # Basic severity detection
+    severity = "minor"
+    if "degraded" in title.lower(): severity = "major"
+    if "outage" in title.lower(): severity = "critical"
+
+    status = "Active"
+    if "resolved" in title.lower() or "operational" in title.lower():
+        status = "Resolved"
+
+    # Filter: Only ingest if it's NOT just "Service is operating normally"
+    if "operating normally" in title.lower():
+        return None
+
+    return {
+        "service": service,
+        "title": title,
+        "status": status,
+        "severity": severity,
+        "url": link,
+        "raw_text": summary
+    }
+
+def persist_incident(db, incident):
+    """Upserts a classified incident. Returns the incident id or None."""
+    return db.upsert_incident(
+        provider_name=incident["service"],
+        title=incident["title"],
+        status=incident["status"],
+        severity=incident["severity"],
+        url=incident["url"],
+        raw_text=incident["raw_text"]
+    )
+
+def check_outages(db=None):
     """
     Checks RSS feeds and updates the database.
     Returns a list of significant updates (for TTS).
     """
-    db = DBManager()
+    db = db or DBManager()
     updates = []
-    
+
     for service, url in FEEDS.items():
         try:
-            feed = feedparser.parse(url)
-            if feed.entries:
-                # Check top 3 entries for active issues
-                for entry in feed.entries[:3]:
-                    # Simple heuristic: if title implies "resolved" or "normal", maybe skip or mark resolved?
-                    # For v1, we ingest everything that looks like an incident.
-                    
-                    title = entry.title
-                    link = entry.link
-                    summary = entry.get("summary", "")
-                    published = entry.get("published", "")
-                    
-                    # Basic severity detection
-                    severity = "minor"
-                    if "degraded" in title.lower(): severity = "major"
-                    if "outage" in title.lower(): severity = "critical"
-                    
-                    status = "Active"
-                    if "resolved" in title.lower() or "operational" in title.lower():
-                        status = "Resolved"
-                    
-                    # Filter: Only ingest if it's NOT just "Service is operating normally"
-                    if "operating normally" in title.lower():
-                        continue
-
-                    # Upsert Incident
-                    incident_id = db.upsert_incident(
-                        provider_name=service,
-                        title=title,
-                        status=status,
-                        severity=severity,
-                        url=link,
-                        raw_text=summary
-                    )
-                    
-                    if incident_id:
-                        # We should check if we already have this specific event logged?
-                        # For now, let's just Log it if it's "New" (heuristic needed)
-                        # or just return it to main to decide if we want to announcer it.
-                        updates.append({
-                            "service": service,
-                            "title": title,
-                            "status": status,
-                            "incident_id": incident_id
-                        })
-                        
+            for entry in fetch_feed(service, url):
+                incident = classify_entry(service, entry)
+                if not incident:
+                    continue
+
+                # Upsert Incident
+                incident_id = persist_incident(db, incident)
+
+                if incident_id:
+                    # We should check if we already have this specific event logged?
+                    # For now, let's just Log it if it's "New" (heuristic needed)
+                    # or just return it to main to decide if we want to announcer it.
+                    updates.append({
+                        "service": service,
+                        "title": incident["title"],
+                        "status": incident["status"],
+                        "incident_id": incident_id
+                    })
+
         except Exception as e:
-            print(f"Error checking {service}: {e}")
-            
+            logging.error(f"Error checking {service}: {e}")
+
     return updates
 
 if __name__ == "__main__":
@@ -0,0 +1,300 @@
+import asyncio
+import logging
+import os
+import signal
+import time
+import uuid
+
+import metrics
+from monitor import FEEDS, fetch_feed, classify_entry, persist_incident
+from config import load_config
+from content_generator import generate_alert_script
+from tts_generator import generate_tts
+
+# Stage order. Each stage reads from its own bounded inbox queue.
+STAGES = ["fetch", "classify", "persist", "script", "synthesize", "play"]
+
+# Manual announcements get their own lane so they never wait behind alert TTS.
+PRIORITY_STAGE = "announce"
+
+STAGE_SECONDS = metrics.histogram("pipeline_stage_seconds", "Time spent handling one item, per stage", ["stage"])
+END_TO_END_SECONDS = metrics.histogram("pipeline_end_to_end_seconds", "Feed fetch to audio queued")
+QUEUE_DEPTH = metrics.gauge("pipeline_queue_depth", "Items waiting in each stage inbox", ["stage"])
+DROPPED = metrics.counter("pipeline_dropped_total", "Announcements shed because a stage queue was full", ["stage"])
+UNCHANGED = metrics.counter("pipeline_unchanged_total", "Persisted incidents not announced because status and severity were unchanged")
+
+
+def _clip_path(kind):
+    """Unique per clip, so a restart never overwrites a clip that is still queued."""
+    return f"audio/{kind}_{uuid.uuid4().hex}.pcm"
+
+
+def _remove_clip(path):
+    if path:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def put_drop_oldest(queue, item, name):
+    """
+    Non-blocking put that sheds the oldest queued item when full.
+    Used for announcement stages so a slow TTS never stalls detection.
+    """
+    while True:
+        try:
+            queue.put_nowait(item)
+            return
+        except asyncio.QueueFull:
+            dropped = queue.get_nowait()
+            queue.task_done()
+            DROPPED.labels(name).inc()
+            _remove_clip(dropped.get("audio_path"))
+            logging.warning(f"{name} queue full, dropping stale announcement: {dropped.get('title')}")
+
+
+class Pipeline:
+    """
+    Staged outage pipeline: fetch -> classify -> persist -> script -> synthesize -> play.
+
+    Stages are connected by bounded asyncio queues. Detection stages (classify,
+    persist, script) apply backpressure by blocking on put; announcement stages
+    (synthesize, play) drop the oldest item instead, so slow audio never holds
+    up detection of the next outage. Blocking I/O runs in worker threads.
+
+    Only incidents that are new, or whose status or severity changed, go past
+    persist; a feed entry that was already resolved when first seen is recorded
+    but not announced.
+    """
+
+    def __init__(self, db, poll_interval=300, audio_queue=None, queue_size=32,
+                 persist_workers=4, drain_timeout=10.0, sources=None, hub=None):
+        self.db = db
+        self.poll_interval = poll_interval
+        self.audio_queue = audio_queue
+        self.queue_size = queue_size
+        self.persist_workers = persist_workers
+        self.drain_timeout = drain_timeout
+        self.sources = sources or []
+        self.hub = hub
+        self.internet_status = "stable"
+        self.histograms = {name: STAGE_SECONDS.labels(name) for name in STAGES + [PRIORITY_STAGE]}
+        self.histograms["end_to_end"] = END_TO_END_SECONDS.labels()
+        self.queues = {}
+        self.incident_state = {}  # incident id -> (status, severity) last seen
+        self._stop_event = None
+
+    @property
+    def audio_enabled(self):
+        return self.audio_queue is not None
+
+    def stop(self):
+        if self._stop_event and not self._stop_event.is_set():
+            logging.info("Shutdown requested, draining pipeline...")
+            self._stop_event.set()
+
+    def _install_signal_handlers(self):
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except (NotImplementedError, RuntimeError):
+                # Not available on this platform / not the main thread
+                pass
+
+    async def run(self):
+        self._stop_event = asyncio.Event()
+        self._install_signal_handlers()
+        await self._load_incident_state()
+
+        for name in STAGES[1:] + [PRIORITY_STAGE]:
+            self.queues[name] = asyncio.Queue(maxsize=self.queue_size)
+            QUEUE_DEPTH.labels(name).set_function(self.queues[name].qsize)
+
+        workers = [
+            asyncio.create_task(self._worker("classify", self._classify)),
+            asyncio.create_task(self._worker("script", self._script)),
+        ]
+        for _ in range(self.persist_workers):
+            workers.append(asyncio.create_task(self._worker("persist", self._persist)))
+        if self.audio_enabled:
+            workers.append(asyncio.create_task(self._worker("synthesize", self._synthesize)))
+            workers.append(asyncio.create_task(self._worker("play", self._play)))
+            workers.append(asyncio.create_task(self._worker(PRIORITY_STAGE, self._announce)))
+
+        producers = [asyncio.create_task(self._fetch_loop())]
+        for source in self.sources:
+            producers.append(asyncio.create_task(source.run(self)))
+
+        await self._stop_event.wait()
+
+        for task in producers:
+            task.cancel()
+        await asyncio.gather(*producers, return_exceptions=True)
+
+        try:
+            await asyncio.wait_for(self._drain(), timeout=self.drain_timeout)
+        except asyncio.TimeoutError:
+            logging.warning(f"Pipeline did not drain within {self.drain_timeout}s, abandoning queued items.")
+
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self.log_histograms()
+
+    async def _drain(self):
+        for name in STAGES[1:] + [PRIORITY_STAGE]:
+            if name in ("synthesize", "play", PRIORITY_STAGE) and not self.audio_enabled:
+                continue
+            await self.queues[name].join()
+
+    async def _load_incident_state(self):
+        """Seeds known incidents so a restart does not re-announce everything still in the feeds."""
+        rows = await asyncio.to_thread(self.db.get_active_incidents)
+        self.incident_state = {row["id"]: (row.get("status"), row.get("severity")) for row in rows}
+
+    def log_histograms(self):
+        for name, hist in self.histograms.items():
+            logging.info(f"Latency {name}: {hist.summary()}",
+                         extra={"stage": name, "count": hist.count, "p50": hist.percentile(50), "p95": hist.percentile(95)})
+
+    async def _emit(self, stage, item):
+        """Hands an item to the given downstream stage."""
+        if stage in ("synthesize", "play", PRIORITY_STAGE):
+            if self.audio_enabled:
+                put_drop_oldest(self.queues[stage], item, stage)
+            return
+        await self.queues[stage].put(item)
+
+    async def _worker(self, name, handler):
+        queue = self.queues[name]
+        hist = self.histograms[name]
+        while True:
+            item = await queue.get()
+            start = time.perf_counter()
+            try:
+                await handler(item)
+            except Exception as e:
+                logging.error(f"Error in {name} stage: {e}")
+            finally:
+                hist.observe(time.perf_counter() - start)
+                queue.task_done()
+
+    # --- External inputs ---
+
+    async def announce(self, text, source="manual", publish=True):
+        """
+        Queues a high-priority announcement that bypasses the detection stages.
+        With `publish`, fanout dashboards also get it as a MANUAL_ANNOUNCE;
+        voiced incident scripts pass False, as the incident reaches them itself.
+        """
+        logging.info(f"Priority announcement ({source}): {text}")
+        if self.hub and publish:
+            self.hub.announce(text)
+        await self._emit(PRIORITY_STAGE, {"title": text, "text": text, "detected_at": time.monotonic()})
+
+    def set_internet_status(self, status):
+        self.internet_status = status
+        logging.info(f"Context: Internet is {status}")
+        if self.hub:
+            self.hub.context(status)
+
+    # --- Stages ---
+
+    async def _fetch_loop(self):
+        while not self._stop_event.is_set():
+            logging.info("--- Starting Polling Cycle ---")
+            await asyncio.gather(
+                self._refresh_context(),
+                *(self._fetch_one(service, url) for service, url in FEEDS.items())
+            )
+            # Re-read each cycle so an edit to api_config.json applies without a restart
+            poll_interval = load_config().get("poll_interval_seconds", self.poll_interval)
+            logging.info(f"Sleeping for {poll_interval} seconds...")
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _refresh_context(self):
+        try:
+            self.set_internet_status(await asyncio.to_thread(self.db.get_internet_condition))
+        except Exception as e:
+            logging.error(f"Error fetching internet condition: {e}")
+
+    async def _fetch_one(self, service, url):
+        start = time.perf_counter()
+        try:
+            entries = await asyncio.to_thread(fetch_feed, service, url)
+        except Exception as e:
+            logging.error(f"Error checking {service}: {e}")
+            return
+        finally:
+            self.histograms["fetch"].observe(time.perf_counter() - start)
+
+        detected_at = time.monotonic()
+        for entry in entries:
+            await self._emit("classify", {"service": service, "entry": entry, "detected_at": detected_at})
+
+    async def _classify(self, item):
+        incident = classify_entry(item["service"], item["entry"])
+        if incident:
+            incident["detected_at"] = item["detected_at"]
+            await self._emit("persist", incident)
+
+    async def _persist(self, incident):
+        incident_id = await asyncio.to_thread(persist_incident, self.db, incident)
+        if not incident_id:
+            return
+        if self.hub:
+            self.hub.incident_changed(incident, incident_id)
+
+        # Feeds repeat the same entries every poll; only announce what changed
+        previous = self.incident_state.get(incident_id)
+        current = (incident["status"], incident["severity"])
+        self.incident_state[incident_id] = current
+        if previous == current or (previous is None and incident["status"] == "Resolved"):
+            UNCHANGED.inc()
+            return
+
+        await self._emit("script", {
+            "service": incident["service"],
+            "title": incident["title"],
+            "status": incident["status"],
+            "incident_id": incident_id,
+            "detected_at": incident["detected_at"]
+        })
+
+    async def _script(self, update):
+        logging.info(f"Processing Alert: {update['service']} - {update['title']}",
+                     extra={"service": update["service"], "incident_id": update["incident_id"]})
+
+        # Generate Context-Aware Script
+        alert_text = generate_alert_script(update["service"], update["title"], update["status"], self.internet_status)
+        logging.info(f"Generated Script: {alert_text}")
+        update["text"] = alert_text
+        if self.hub:
+            self.hub.caption(alert_text)
+
+        # Announce first, then insert Event into DB (Triggers Frontend Animation)
+        await self._emit("synthesize", update)
+        await asyncio.to_thread(self.db.insert_event, update["incident_id"], alert_text, "alert")
+
+    async def _synthesize(self, update):
+        output_path = _clip_path("alert")
+        path = await asyncio.to_thread(generate_tts, update["text"], output_path)
+        if path:
+            update["audio_path"] = path
+            await self._emit("play", update)
+
+    async def _play(self, update):
+        self.audio_queue.add_audio(update["audio_path"], delete_after=True)
+        self.histograms["end_to_end"].observe(time.monotonic() - update["detected_at"])
+
+    async def _announce(self, item):
+        output_path = _clip_path("announce")
+        path = await asyncio.to_thread(generate_tts, item["text"], output_path)
+        if path:
+            self.audio_queue.add_audio(path, priority=True, delete_after=True)
+            self.histograms["end_to_end"].observe(time.monotonic() - item["detected_at"])
@@ -0,0 +1,118 @@
+import asyncio
+import json
+import logging
+import os
+
+from config import load_config
+from content_generator import generate_alert_script
+
+DEFAULT_CURSOR_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../config/producer_cursor.json")
+
+
+class ProducerEventConsumer:
+    """
+    Tails the producer_events table and feeds manual events into the pipeline.
+
+    Uses incremental polling (created_at >= cursor) rather than a realtime
+    socket, so it only needs the same REST client as DBManager. The cursor is
+    the last handled created_at plus the ids already handled at that
+    timestamp; it is persisted after every event, so restarts neither replay
+    nor skip events.
+
+    `db` is anything with get_producer_events()/get_latest_producer_event()/
+    get_provider_name(), so a local stand-in can replace DBManager.
+    """
+
+    def __init__(self, db, cursor_path=DEFAULT_CURSOR_PATH, poll_interval=1.0, batch_size=50):
+        self.db = db
+        self.cursor_path = cursor_path
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.cursor = None
+        self.seen_ids = set()
+        self._load_cursor()
+
+    def _load_cursor(self):
+        try:
+            with open(self.cursor_path) as f:
+                state = json.load(f)
+            self.cursor = state.get("created_at")
+            self.seen_ids = set(state.get("ids", []))
+            logging.info(f"Resuming producer events from {self.cursor}")
+            return
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.error(f"Error loading producer cursor: {e}")
+
+        # First start: begin at the newest event instead of replaying history
+        latest = self.db.get_latest_producer_event()
+        if latest:
+            self._advance(latest)
+
+    def _advance(self, event):
+        if event["created_at"] != self.cursor:
+            self.cursor = event["created_at"]
+            self.seen_ids = set()
+        self.seen_ids.add(event["id"])
+
+    def _save_cursor(self):
+        tmp_path = self.cursor_path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.cursor_path), exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump({"created_at": self.cursor, "ids": sorted(self.seen_ids)}, f)
+            os.replace(tmp_path, self.cursor_path)
+        except Exception as e:
+            logging.error(f"Error saving producer cursor: {e}")
+
+    def poll_once(self):
+        """Returns new (not yet handled) events since the cursor, oldest first."""
+        events = self.db.get_producer_events(since=self.cursor, limit=self.batch_size)
+        return [e for e in events if not (e["created_at"] == self.cursor and e["id"] in self.seen_ids)]
+
+    async def handle(self, event, pipeline):
+        event_type = event.get("type")
+        payload = event.get("payload") or {}
+
+        if event_type == "ANNOUNCE":
+            message = payload.get("message")
+            if message:
+                await pipeline.announce(message, source="producer")
+        elif event_type == "SIM_OUTAGE":
+            # The dashboard has already inserted the incident; we only voice it.
+            title = payload.get("title", "Unknown incident")
+            service = await asyncio.to_thread(self.db.get_provider_name, payload.get("provider_id"))
+            await pipeline.announce(
+                generate_alert_script(service or "a monitored service", title, payload.get("status", "Active"), pipeline.internet_status),
+                source="producer", publish=False
+            )
+        elif event_type == "RESOLVE":
+            title = payload.get("title")
+            await pipeline.announce(f"Service restored. {title}." if title else "Service restored.", source="producer", publish=False)
+        elif event_type == "CONTEXT_SET":
+            status = payload.get("status")
+            if status:
+                pipeline.set_internet_status(status)
+        else:
+            logging.warning(f"Ignoring unknown producer event type: {event_type}")
+
+    async def consume_once(self, pipeline):
+        """Handles every new event, saving the cursor after each. Returns how many were handled."""
+        events = await asyncio.to_thread(self.poll_once)
+        for event in events:
+            await self.handle(event, pipeline)
+            self._advance(event)
+            self._save_cursor()
+        return len(events)
+
+    async def run(self, pipeline):
+        logging.info("Producer event consumer started.")
+        while True:
+            try:
+                await self.consume_once(pipeline)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Error consuming producer events: {e}")
+            await asyncio.sleep(load_config().get("producer_poll_interval_seconds", self.poll_interval))
@@ -0,0 +1,52 @@
+import asyncio
+import logging
+import time
+
+import metrics
+from config import load_config
+
+COMPACTED = metrics.counter("incident_events_compacted_total", "incident_events rolled up into summaries and deleted")
+LAST_RUN = metrics.gauge("event_compaction_last_run_timestamp_seconds", "Unix time of the last completed compaction")
+
+
+class EventCompactor:
+    """
+    Keeps incident_events bounded: every `interval` seconds, events older than
+    `retention_days` are rolled up into incident_event_summaries and deleted,
+    in batches so no single transaction holds locks for long.
+
+    Runs as a pipeline source. `db` is anything with compact_events().
+    """
+
+    def __init__(self, db, retention_days=7, interval=3600.0, batch_size=10000, max_batches=100):
+        self.db = db
+        self.retention_days = retention_days
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+
+    def compact_once(self):
+        """Compacts until the backlog is cleared (or max_batches). Returns events removed."""
+        retention_days = load_config().get("event_retention_days", self.retention_days)
+        total = 0
+        for _ in range(self.max_batches):
+            removed = self.db.compact_events(retention_days, self.batch_size)
+            total += removed
+            if removed < self.batch_size:
+                break
+        COMPACTED.inc(total)
+        LAST_RUN.set(time.time())
+        if total:
+            logging.info(f"Compacted {total} incident events older than {retention_days} days", extra={"compacted": total})
+        return total
+
+    async def run(self, pipeline):
+        logging.info("Event compaction started.")
+        while True:
+            try:
+                await asyncio.to_thread(self.compact_once)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Error compacting incident events: {e}")
+            await asyncio.sleep(load_config().get("compaction_interval_seconds", self.interval))
@@ -1,40 +1,213 @@
+import logging
 import subprocess
 import os
-import time
-import json
+import re
+import threading
+import metrics
+from config import load_config, load_stream_config
 
-def load_config():
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    config_path = os.path.join(current_dir, "../config/api_config.json")
-    with open(config_path) as f:
-        return json.load(f)
+FFMPEG_SPEED = metrics.gauge("ffmpeg_speed_ratio", "Encode speed relative to real time (1.0 = keeping up)")
+FFMPEG_FPS = metrics.gauge("ffmpeg_fps", "Frames encoded per second")
+FFMPEG_PROGRESS = re.compile(r"fps=\s*([\d.]+).*?speed=\s*([\d.]+)x")
 
-def start_stream(image_path="dashboard.png", local_output=None):
+def _pump_ffmpeg_log(stderr, log_path):
+    """
+    Copies ffmpeg's stderr to the log file while extracting fps/speed for metrics.
+    stderr is always drained, even if the log can't be written: a full pipe
+    would block ffmpeg and freeze the stream.
+    """
+    pending = ""
+    write_failed = False
+    try:
+        log_file = open(log_path, "wb")
+    except OSError as e:
+        logging.error(f"Cannot open {log_path}, ffmpeg output will not be logged: {e}")
+        log_file = None
+
+    for chunk in iter(lambda: stderr.read1(4096), b""):
+        if log_file:
+            try:
+                log_file.write(chunk)
+                log_file.flush()
+                write_failed = False
+            except OSError as e:
+                # e.g. disk full: report once, keep retrying on later chunks
+                if not write_failed:
+                    logging.error(f"Error writing {log_path}: {e}")
+                write_failed = True
+
+        # Progress lines end in \r, so split on both line endings
+        pending += chunk.decode("utf-8", errors="replace")
+        *lines, pending = re.split(r"[\r\n]", pending)
+        for line in lines:
+            match = FFMPEG_PROGRESS.search(line)
+            if match:
+                try:
+                    FFMPEG_FPS.set(float(match.group(1)))
+                    FFMPEG_SPEED.set(float(match.group(2)))
+                except ValueError:
+                    pass
+
+    if log_file:
+        try:
+            log_file.close()
+        except OSError:
+            pass
+
+# Muxer (and muxer options) per sink, picked from the URL scheme or file extension.
+# Fragmented MP4 stays playable if ffmpeg is killed mid-stream.
+SINK_FORMATS = {
+    ".flv": ("flv", {}),
+    ".mp4": ("mp4", {"movflags": "+frag_keyframe+empty_moov"}),
+    ".mkv": ("matroska", {}),
+    ".ts": ("mpegts", {}),
+}
+
+SINK_SCHEMES = {
+    "rtmp": ("flv", {}),
+    "rtmps": ("flv", {}),
+    "srt": ("mpegts", {}),
+    "udp": ("mpegts", {}),
+}
+
+def _sink_format(target):
+    """(muxer, options) for a sink, or None for a URL scheme we don't know how to feed."""
+    if "://" in target:
+        return SINK_SCHEMES.get(target.split("://", 1)[0].lower())
+    return SINK_FORMATS.get(os.path.splitext(target)[1].lower(), ("flv", {}))
+
+def _tee_escape(text):
+    for char in "\\|[]":
+        text = text.replace(char, "\\" + char)
+    return text
+
+def choose_outputs(outputs, local_output, stream_config):
+    """
+    Which outputs to use: --output targets first, then a local dry-run /
+    preview file, then stream_config "outputs". A dry run never falls through
+    to the configured (possibly live) sinks.
+    """
+    if outputs:
+        return outputs
+    if local_output:
+        return [local_output]
+    return stream_config.get("outputs")
+
+def resolve_sinks(outputs, local_output, config):
+    """
+    Returns the list of output targets. "youtube" in `outputs` expands to the
+    configured RTMP URL. Returns None if YouTube is needed but not configured,
+    or a target uses an unsupported URL scheme.
+    """
+    if not outputs:
+        outputs = [local_output] if local_output else ["youtube"]
+
+    sinks = []
+    for target in outputs:
+        if target == "youtube":
+            stream_key = config.get("youtube_stream_key")
+            if not stream_key or stream_key == "YOUR_YOUTUBE_STREAM_KEY":
+                logging.error("YouTube Stream Key not configured.")
+                return None
+            target = f"{config.get('youtube_stream_url')}/{stream_key}"
+        elif _sink_format(target) is None:
+            logging.error(f"Unsupported stream output: {target} (use {', '.join(SINK_SCHEMES)} URLs or a file path)")
+            return None
+        if target not in sinks:
+            sinks.append(target)
+    return sinks
+
+def build_output_args(sinks):
+    """
+    FFmpeg output arguments for one or more sinks. Several sinks share a single
+    encode through the tee muxer; onfail=ignore keeps the others running if one
+    sink (e.g. an RTMP ingest) drops, and use_fifo gives each sink its own
+    buffer so a slow one cannot stall the rest.
+    """
+    if len(sinks) == 1:
+        fmt, options = _sink_format(sinks[0])
+        args = ["-f", fmt]
+        for key, value in options.items():
+            args.extend([f"-{key}", value])
+        return args + [sinks[0]]
+
+    slaves = []
+    for target in sinks:
+        fmt, options = _sink_format(target)
+        slave_options = ":".join([f"f={fmt}"] + [f"{k}={v}" for k, v in options.items()] + ["onfail=ignore"])
+        slaves.append(f"[{slave_options}]{_tee_escape(target)}")
+    return ["-flags", "+global_header", "-f", "tee", "-use_fifo", "1", "|".join(slaves)]
+
+def _redact(cmd, secret):
+    """The command line for logging, with the stream key masked."""
+    shown = " ".join(cmd)
+    if secret:
+        shown = shown.replace(secret, "<stream key>")
+    return shown
+
+def composite_filter(stream_config, profile=None):
+    """
+    Filter graph overlaying the dashboard panel on the background.
+    With an encoder profile the output size comes from the profile and panel
+    geometry is scaled to match; a pre-scaled background skips the per-frame scale.
+    """
+    video_w = stream_config.get("video_width", 1280)
+    video_h = stream_config.get("video_height", 720)
+    overlay_w = stream_config.get("overlay_width", 800)
+    overlay_h = stream_config.get("overlay_height", 220)
+    overlay_x = stream_config.get("overlay_x", 240)
+    overlay_y = stream_config.get("overlay_y", 460)
+
+    if profile:
+        # Scale each axis on its own, so a profile with another aspect ratio can't misplace the panel
+        fx, fy = profile["width"] / video_w, profile["height"] / video_h
+        overlay_w, overlay_x = [int(round(v * fx / 2)) * 2 for v in (overlay_w, overlay_x)]
+        overlay_h, overlay_y = [int(round(v * fy / 2)) * 2 for v in (overlay_h, overlay_y)]
+        video_w, video_h = profile["width"], profile["height"]
+        if profile.get("prescaled"):
+            return (
+                f"[1:v]scale={overlay_w}:{overlay_h}[panel];"
+                f"[0:v][panel]overlay=x={overlay_x}:y={overlay_y}[outv]"
+            )
+
+    # Scale bg to 1280x720
+    # Scale panel to 800x220
+    # Overlay panel on bg
+    return (
+        f"[0:v]scale={video_w}:{video_h}[bg];"
+        f"[1:v]scale={overlay_w}:{overlay_h}[panel];"
+        f"[bg][panel]overlay=x={overlay_x}:y={overlay_y}[outv]"
+    )
+
+def encode_args(profile=None):
+    """Codec arguments; the profile (from encoder_tuning) picks preset and GOP."""
+    preset = profile["preset"] if profile else "veryfast"
+    gop = profile["gop"] if profile else 50
+    return [
+        "-c:v", "libx264", "-preset", preset, "-pix_fmt", "yuv420p", "-g", str(gop),
+        "-c:a", "aac", "-b:a", "128k"
+    ]
+
+def start_stream(image_path="dashboard.png", local_output=None, outputs=None, profile=None):
     """
     Starts streaming. If local_output is set, saves to that file instead of RTMP.
+    `outputs` (or stream_config "outputs") lists several sinks - RTMP URLs, file
+    paths or "youtube" - which are all fed from one encode.
+    `profile` is a calibrated encoder profile (see encoder_tuning).
     """
     config = load_config()
-    stream_key = config.get("youtube_stream_key")
-    stream_url = config.get("youtube_stream_url")
-    
-    if not stream_key or stream_key == "YOUR_YOUTUBE_STREAM_KEY":
-        print("Error: YouTube Stream Key not configured.")
-        return
 
     # Load stream config
-    stream_config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../config/stream_config.json")
-    try:
-        with open(stream_config_path) as f:
-            stream_config = json.load(f)
-    except:
-        stream_config = {
-            "video_width": 1280, "video_height": 720,
-            "overlay_width": 800, "overlay_height": 220,
-            "overlay_x": 240, "overlay_y": 460
-        }
+    stream_config = load_stream_config()
+
+    sinks = resolve_sinks(choose_outputs(outputs, local_output, stream_config), local_output, config)
+    if not sinks:
+        return None
 
     # Assets
     background_video = stream_config.get("background_video_path", "assets/yall_bot_idle.mp4")
+    if profile:
+        background_video = profile["background_path"]
     audio_source = "audio/report.wav"
     
     # Check if audio exists, otherwise use silent
@@ -55,7 +228,7 @@ def start_stream(image_path="dashboard.png", local_output=None):
     # Audio Source
     if os.path.exists("audio/live_audio.fifo"):
         # Use FIFO with raw PCM settings (24kHz, 16-bit Mono)
-        print("Using Audio FIFO...")
+        logging.info("Using Audio FIFO...")
         cmd.extend([
             "-f", "s16le", "-ar", "24000", "-ac", "1", "-i", "audio/live_audio.fifo"
         ])
@@ -66,47 +239,24 @@ def start_stream(image_path="dashboard.png", local_output=None):
         # Silent audio fallback
         cmd.extend(["-f", "lavfi", "-i", "anullsrc=channel_layout=stereo:sample_rate=44100"])
 
-    # Filter Complex
-    # Scale bg to 1280x720
-    # Scale panel to 800x220
-    # Overlay panel on bg
-    
-    video_w = stream_config.get("video_width", 1280)
-    video_h = stream_config.get("video_height", 720)
-    overlay_w = stream_config.get("overlay_width", 800)
-    overlay_h = stream_config.get("overlay_height", 220)
-    overlay_x = stream_config.get("overlay_x", 240)
-    overlay_y = stream_config.get("overlay_y", 460)
-    
-    filter_complex = (
-        f"[0:v]scale={video_w}:{video_h}[bg];"
-        f"[1:v]scale={overlay_w}:{overlay_h}[panel];"
-        f"[bg][panel]overlay=x={overlay_x}:y={overlay_y}[outv]"
-    )
-    
     cmd.extend([
-        "-filter_complex", filter_complex,
+        "-filter_complex", composite_filter(stream_config, profile),
         "-map", "[outv]",
-        "-map", "2:a" if has_audio else "2:a", # Map the audio input (index 2 is either file or nullsrc)
-        "-c:v", "libx264", "-preset", "veryfast", "-pix_fmt", "yuv420p", "-g", "50",
-        "-c:a", "aac", "-b:a", "128k",
-        "-f", "flv"
+        "-map", "2:a", # Map the audio input (index 2 is either file or nullsrc)
     ])
+    cmd.extend(encode_args(profile))
     
-    if local_output:
-        print(f"Streaming locally to {local_output}...")
-        cmd.append(local_output)
-    else:
-        cmd.append(f"{stream_url}/{stream_key}")
+    logging.info(f"Streaming to {len(sinks)} output(s)...", extra={"sinks": len(sinks)})
+    cmd.extend(build_output_args(sinks))
 
-    print("Starting stream with command:", " ".join(cmd))
+    logging.info(f"Starting stream with command: {_redact(cmd, config.get('youtube_stream_key'))}")
     try:
-        # Run ffmpeg and redirect stderr to a log file
-        with open("ffmpeg.log", "w") as log_file:
-            process = subprocess.Popen(cmd, stderr=log_file)
+        # Run ffmpeg; a pump thread copies stderr to ffmpeg.log and reads progress
+        process = subprocess.Popen(cmd, stderr=subprocess.PIPE)
+        threading.Thread(target=_pump_ffmpeg_log, args=(process.stderr, "ffmpeg.log"), daemon=True).start()
         return process
     except FileNotFoundError:
-        print("Error: FFmpeg not found. Please install FFmpeg.")
+        logging.error("FFmpeg not found. Please install FFmpeg.")
         return None
 
 if __name__ == "__main__":
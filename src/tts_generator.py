@@ -1,44 +1,88 @@
-import openai
+import hashlib
+import logging
 import os
-import json
+import shutil
+import tempfile
+import time
+import metrics
+from config import load_config, load_stream_config
 
-def load_config():
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    config_path = os.path.join(current_dir, "../config/api_config.json")
-    with open(config_path) as f:
-        return json.load(f)
+TTS_CACHE_DIR = "audio/tts_cache"
+TTS_CACHE_MAX_FILES = 256
+
+TTS_SECONDS = metrics.histogram("tts_request_seconds", "OpenAI TTS request latency")
+TTS_CACHE = metrics.counter("tts_cache_total", "TTS cache lookups", ["result"])
+TTS_ERRORS = metrics.counter("tts_errors_total", "Failed TTS requests")
+
+def _cache_path(script_text, voice, model):
+    digest = hashlib.sha1(f"{model}\0{voice}\0{script_text}".encode("utf-8")).hexdigest()
+    return os.path.join(TTS_CACHE_DIR, f"{digest}.pcm")
+
+def _prune_cache():
+    """Keeps the cache to TTS_CACHE_MAX_FILES by dropping the least recently used clips."""
+    try:
+        entries = [os.path.join(TTS_CACHE_DIR, name) for name in os.listdir(TTS_CACHE_DIR) if name.endswith(".pcm")]
+        if len(entries) <= TTS_CACHE_MAX_FILES:
+            return
+        entries.sort(key=os.path.getmtime)
+        for path in entries[:len(entries) - TTS_CACHE_MAX_FILES]:
+            os.remove(path)
+    except OSError as e:
+        logging.error(f"Error pruning TTS cache: {e}")
+
+def _store_in_cache(output_path, cache_path):
+    """Copies a fresh clip into the cache via a temp file, so a crash never leaves a truncated hit."""
+    fd, tmp_path = tempfile.mkstemp(dir=TTS_CACHE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp_file, open(output_path, "rb") as clip:
+            shutil.copyfileobj(clip, tmp_file)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logging.error(f"Error caching TTS clip: {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
 
 def generate_tts(script_text, output_path="audio/report.pcm"):
     """
     Generates audio from the script text using OpenAI's TTS API.
+    Identical scripts are served from a local cache instead of calling the API again.
     """
-    config = load_config()
-    openai.api_key = config.get("openai_api_key")
-    
-    if not openai.api_key or openai.api_key == "YOUR_OPENAI_API_KEY":
-        print("Error: OpenAI API Key not configured for TTS.")
-        return None
-
     # Load stream config for TTS settings
-    stream_config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../config/stream_config.json")
-    try:
-        with open(stream_config_path) as f:
-            stream_config = json.load(f)
-    except:
-        stream_config = {}
+    stream_config = load_stream_config()
 
     if not stream_config.get("tts_enabled", True):
-        print("TTS is disabled in config.")
+        logging.info("TTS is disabled in config.")
         return None
 
     voice = stream_config.get("tts_voice", "alloy")
     model = stream_config.get("tts_model", "tts-1")
 
-    # Ensure audio directory exists
+    # Ensure audio directories exist
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    os.makedirs(TTS_CACHE_DIR, exist_ok=True)
+
+    cache_path = _cache_path(script_text, voice, model)
+    if os.path.exists(cache_path):
+        TTS_CACHE.labels("hit").inc()
+        os.utime(cache_path)
+        shutil.copyfile(cache_path, output_path)
+        return output_path
+    TTS_CACHE.labels("miss").inc()
+
+    import openai  # deferred: heavy import only needed once we actually speak
+
+    config = load_config()
+    openai.api_key = config.get("openai_api_key")
+    
+    if not openai.api_key or openai.api_key == "YOUR_OPENAI_API_KEY":
+        logging.error("OpenAI API Key not configured for TTS.")
+        return None
 
-    print(f"Generating TTS for: {script_text[:50]}... (Voice: {voice}, Model: {model})")
+    logging.info(f"Generating TTS for: {script_text[:50]}...", extra={"voice": voice, "model": model})
     
+    start = time.perf_counter()
     try:
         response = openai.audio.speech.create(
             model=model,
@@ -48,11 +92,17 @@ def generate_tts(script_text, output_path="audio/report.pcm"):
         )
         
         response.stream_to_file(output_path)
-        print(f"Audio saved to {output_path}")
-        return output_path
+        logging.info(f"Audio saved to {output_path}", extra={"path": output_path})
     except Exception as e:
-        print(f"Error generating TTS: {e}")
+        TTS_ERRORS.inc()
+        logging.error(f"Error generating TTS: {e}", extra={"voice": voice, "model": model})
         return None
+    finally:
+        TTS_SECONDS.observe(time.perf_counter() - start)
+
+    _store_in_cache(output_path, cache_path)
+    _prune_cache()
+    return output_path
 
 if __name__ == "__main__":
     # Test
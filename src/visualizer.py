@@ -1,4 +1,3 @@
-from PIL import Image, ImageDraw, ImageFont
 import os
 from datetime import datetime
 
@@ -6,6 +5,7 @@ def create_dashboard(outage_report, output_path="dashboard.png"):
     """
     Creates a visual dashboard of the outage report.
     """
+    from PIL import Image, ImageDraw, ImageFont  # deferred: slow import
     # Create a black background
     width, height = 1280, 720
     img = Image.new('RGB', (width, height), color=(10, 10, 10))
@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+from audio_queue import AudioQueue
+from standins import FifoDrain
+
+
+@pytest.fixture
+def fifo_path(tmp_path):
+    return str(tmp_path / "audio" / "live_audio.fifo")
+
+
+def make_clip(tmp_path, name, seconds=0.1):
+    path = tmp_path / f"{name}.pcm"
+    path.write_bytes(b"\x00" * int(FifoDrain.BYTES_PER_SEC * seconds))
+    return str(path)
+
+
+def test_wait_until_played_plays_queued_clips(tmp_path, fifo_path):
+    queue = AudioQueue(fifo_path=fifo_path)
+    drain = FifoDrain(fifo_path)
+    clip = make_clip(tmp_path, "alert")
+    try:
+        queue.add_audio(clip, delete_after=True)
+        assert queue.wait_until_played(timeout=5)
+        assert not os.path.exists(clip)
+    finally:
+        queue.stop()
+        queue.thread.join(timeout=3)
+        drain.stop()
+
+
+def test_priority_clips_jump_the_queue_in_order(tmp_path, fifo_path):
+    # No reader: the writer waits on the FIFO, so nothing is dequeued
+    queue = AudioQueue(fifo_path=fifo_path)
+    try:
+        for name, priority in [("alert1", False), ("announce_first", True), ("alert2", False), ("announce_second", True)]:
+            queue.add_audio(make_clip(tmp_path, name), priority=priority)
+
+        order = [os.path.basename(path)[:-len(".pcm")] for path, _, _ in queue.queue]
+        assert order == ["announce_first", "announce_second", "alert1", "alert2"]
+    finally:
+        queue.stop()
+        # Let the blocked writer open the FIFO and exit
+        reader = os.open(fifo_path, os.O_RDONLY | os.O_NONBLOCK)
+        queue.thread.join(timeout=3)
+        os.close(reader)
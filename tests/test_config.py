@@ -0,0 +1,61 @@
+import json
+import os
+
+import config
+from config import ConfigFile
+
+SCHEMA = {"poll_interval_seconds": ((int, float), True), "supabase_url": (str, False)}
+
+
+def write(path, data, mtime_ns):
+    path.write_text(json.dumps(data))
+    # Explicit mtimes, so the test doesn't depend on filesystem timestamp resolution
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_reloads_when_mtime_changes(tmp_path):
+    path = tmp_path / "api_config.json"
+    write(path, {"poll_interval_seconds": 300}, 1_000_000_000)
+    cfg = ConfigFile(str(path), schema=SCHEMA, check_interval=0)
+    assert cfg.get()["poll_interval_seconds"] == 300
+
+    write(path, {"poll_interval_seconds": 60}, 2_000_000_000)
+    assert cfg.get()["poll_interval_seconds"] == 60
+
+
+def test_unchanged_file_is_not_reparsed(tmp_path):
+    path = tmp_path / "api_config.json"
+    write(path, {"poll_interval_seconds": 300}, 1_000_000_000)
+    cfg = ConfigFile(str(path), schema=SCHEMA, check_interval=0)
+    first = cfg.get()
+    assert cfg.get() is first
+
+
+def test_invalid_edit_keeps_last_good_config(tmp_path):
+    path = tmp_path / "api_config.json"
+    write(path, {"poll_interval_seconds": 300, "supabase_url": "https://x"}, 1_000_000_000)
+    cfg = ConfigFile(str(path), schema=SCHEMA, check_interval=0)
+    cfg.get()
+
+    write(path, {"poll_interval_seconds": -5, "supabase_url": "https://y"}, 2_000_000_000)
+    assert cfg.get() == {"poll_interval_seconds": 300, "supabase_url": "https://x"}
+
+    path.write_text("{not json")
+    os.utime(path, ns=(3_000_000_000, 3_000_000_000))
+    assert cfg.get()["poll_interval_seconds"] == 300
+
+
+def test_first_load_drops_only_bad_keys(tmp_path):
+    path = tmp_path / "api_config.json"
+    write(path, {"poll_interval_seconds": "fast", "supabase_url": "https://x", "extra": 1}, 1_000_000_000)
+    cfg = ConfigFile(str(path), defaults={"poll_interval_seconds": 300}, schema=SCHEMA, check_interval=0)
+    assert cfg.get() == {"poll_interval_seconds": 300, "supabase_url": "https://x", "extra": 1}
+
+
+def test_missing_file_uses_defaults(tmp_path):
+    cfg = ConfigFile(str(tmp_path / "missing.json"), defaults={"video_width": 1280}, check_interval=0)
+    assert cfg.get() == {"video_width": 1280}
+
+
+def test_validate_rejects_bools_for_numbers():
+    assert config.validate({"poll_interval_seconds": True}, SCHEMA) == ["'poll_interval_seconds' has invalid type bool"]
@@ -0,0 +1,63 @@
+import pytest
+
+import encoder_tuning
+from streamer import composite_filter
+
+
+def test_candidates_start_at_configured_size():
+    candidates = encoder_tuning.build_candidates(1920, 1080)
+
+    assert candidates[0] == ("veryfast", 1920, 1080)
+    assert ("veryfast", 1280, 720) in candidates
+    assert candidates[-1] == ("ultrafast", 640, 360)
+
+
+def test_candidates_keep_aspect_ratio():
+    for _, width, height in encoder_tuning.build_candidates(1080, 1920):
+        assert abs(width / height - 1080 / 1920) < 0.01
+
+
+def test_panel_scales_per_axis():
+    stream_config = {"video_width": 1000, "video_height": 1000, "overlay_width": 500, "overlay_height": 200,
+                     "overlay_x": 100, "overlay_y": 600}
+    profile = {"width": 500, "height": 250, "prescaled": True}
+
+    assert composite_filter(stream_config, profile) == (
+        "[1:v]scale=250:50[panel];[0:v][panel]overlay=x=50:y=150[outv]"
+    )
+
+
+@pytest.fixture
+def calibration(tmp_path, monkeypatch):
+    stream_config = {"video_width": 1280, "video_height": 720, "background_video_path": "bg.mp4"}
+    runs = []
+
+    def fake_calibrate(image_path="dashboard.png", candidates=None, target_speed=None):
+        runs.append(encoder_tuning._video_size(stream_config))
+        width, height = encoder_tuning._video_size(stream_config)
+        return {"preset": "veryfast", "width": width, "height": height, "fps": 25, "gop": 50,
+                "background_path": "bg.mp4", "prescaled": False, "speed": 2.0}
+
+    monkeypatch.setattr(encoder_tuning, "PROFILE_PATH", str(tmp_path / "encoder_profile.json"))
+    monkeypatch.setattr(encoder_tuning, "load_stream_config", lambda: stream_config)
+    monkeypatch.setattr(encoder_tuning, "prepare_background", lambda source, width, height: source)
+    monkeypatch.setattr(encoder_tuning, "calibrate", fake_calibrate)
+    return stream_config, runs
+
+
+def test_cached_profile_reused_for_same_size(calibration):
+    _, runs = calibration
+    encoder_tuning.load_or_calibrate()
+    encoder_tuning.load_or_calibrate()
+    assert len(runs) == 1
+
+
+def test_video_size_change_recalibrates(calibration):
+    stream_config, runs = calibration
+    encoder_tuning.load_or_calibrate()
+
+    stream_config.update(video_width=1920, video_height=1080)
+    profile = encoder_tuning.load_or_calibrate()
+
+    assert runs == [(1280, 720), (1920, 1080)]
+    assert (profile["width"], profile["height"]) == (1920, 1080)
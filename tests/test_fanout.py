@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from db_manager import DBManager
+from fanout import EventHub, IncidentWatcher
+from standins import LocalSupabase
+
+INCIDENT = {"service": "AWS", "title": "EC2 errors", "status": "Active", "severity": "major", "url": None}
+
+
+def publish(hub, count):
+    for i in range(count):
+        hub.announce(f"announcement {i}")
+
+
+def test_since_up_to_date_client_gets_nothing():
+    hub = EventHub()
+    publish(hub, 3)
+    assert hub.since(3) == []
+
+
+def test_since_replays_missed_events():
+    hub = EventHub()
+    publish(hub, 5)
+    assert [event["seq"] for event in hub.since(2)] == [3, 4, 5]
+
+
+def test_since_gap_no_longer_buffered_needs_snapshot():
+    hub = EventHub(buffer_size=3)
+    publish(hub, 5)
+    assert hub.since(1) is None
+    assert [event["seq"] for event in hub.since(2)] == [3, 4, 5]
+
+
+def test_since_client_ahead_after_restart_needs_snapshot():
+    hub = EventHub()
+    publish(hub, 2)
+    # Client last saw seq 40 from the previous bot process
+    assert hub.since(40) is None
+
+
+def test_unchanged_incident_is_not_republished():
+    hub = EventHub()
+    assert hub.incident_changed(INCIDENT, "id-1")["type"] == "INCIDENT_NEW"
+    assert hub.incident_changed(INCIDENT, "id-1") is None
+    assert hub.incident_changed({**INCIDENT, "severity": "critical"}, "id-1")["type"] == "INCIDENT_UPDATE"
+    assert hub.incident_changed({**INCIDENT, "severity": "critical", "status": "Resolved"}, "id-1")["type"] == "INCIDENT_RESOLVED"
+    assert hub.seq == 3
+
+
+def test_caption_priority_matches_dashboard():
+    hub = EventHub()
+    event = hub.caption("Service outage detected for AWS.")
+    assert (event["type"], event["priority"]) == ("INCIDENT_UPDATE", 3)
+
+
+def test_inactive_row_resolves_and_leaves_snapshot():
+    hub = EventHub()
+    hub.incident_changed(INCIDENT, "id-1")
+    row = {**hub.snapshot()["incidents"][0], "active": False}
+
+    assert hub.apply_incident(row)["type"] == "INCIDENT_RESOLVED"
+    assert hub.snapshot()["incidents"] == []
+    # Never shown, so nothing to resolve
+    assert hub.apply_incident({**row, "id": "id-2"}) is None
+
+
+@pytest.fixture
+def supabase():
+    return LocalSupabase()
+
+
+def add_incident(supabase, title, seconds, **values):
+    last_update = (datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(seconds=seconds)).isoformat()
+    row = {"title": title, "status": "Investigating", "severity": "major", "last_update": last_update, **values}
+    return supabase.table("incidents").insert(row).execute().data[0]
+
+
+def test_watcher_publishes_incidents_the_bot_did_not_make(supabase):
+    add_incident(supabase, "Old incident", 1)
+    hub = EventHub()
+    watcher = IncidentWatcher(DBManager(client=supabase), hub)
+    hub.load_snapshot(DBManager(client=supabase).get_active_incidents())
+
+    # Injected from the producer page
+    row = add_incident(supabase, "Simulated outage", 2)
+    watcher.poll_once()
+    assert [event["type"] for event in hub.since(0)] == ["INCIDENT_NEW"]
+    assert any(incident["id"] == row["id"] for incident in hub.snapshot()["incidents"])
+
+    # Re-reading the boundary row is harmless
+    watcher.poll_once()
+    assert hub.seq == 1
+
+    supabase.table("incidents").update({"active": False, "last_update": "2026-01-01T00:00:03+00:00"}).eq("id", row["id"]).execute()
+    watcher.poll_once()
+    assert hub.since(1)[0]["type"] == "INCIDENT_RESOLVED"
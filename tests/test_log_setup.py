@@ -0,0 +1,59 @@
+import json
+import logging
+import queue
+
+from log_setup import JsonFormatter, NonBlockingQueueHandler, SamplingFilter
+
+
+def record(msg, level=logging.INFO, module="audio_queue", args=()):
+    return logging.LogRecord("root", level, f"src/{module}.py", 1, msg, args, None)
+
+
+def test_queued_record_keeps_exception_for_json_formatter():
+    log_queue = queue.Queue()
+    logger = logging.getLogger("test_log_setup.exc")
+    logger.propagate = False
+    logger.addHandler(NonBlockingQueueHandler(log_queue))
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("Failed to fetch %s", "AWS")
+
+    queued = log_queue.get_nowait()
+    assert queued.exc_info is not None
+    assert queued.args == ("AWS",)
+
+    entry = json.loads(JsonFormatter().format(queued))
+    assert entry["msg"] == "Failed to fetch AWS"
+    assert "ValueError: boom" in entry["exc"]
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    handler.handle(record("first"))
+    handler.handle(record("second"))
+    assert handler.queue.qsize() == 1
+
+
+def test_sampling_keeps_one_in_n():
+    sampling = SamplingFilter({("audio_queue", "Queued audio"): 3})
+
+    kept = [i for i in range(7) if sampling.filter(record(f"Queued audio: clip_{i}.pcm"))]
+
+    assert kept == [0, 3, 6]
+
+
+def test_sampling_passes_warnings_and_other_messages():
+    sampling = SamplingFilter({("audio_queue", "Queued audio"): 3})
+    sampling.filter(record("Queued audio: a.pcm"))
+
+    assert sampling.filter(record("Queued audio: b.pcm", level=logging.WARNING))
+    assert sampling.filter(record("Audio writer loop started."))
+    assert sampling.filter(record("Queued audio: c.pcm", module="pipeline"))
+
+
+def test_sampled_records_note_the_rate():
+    sampling = SamplingFilter({("audio_queue", "Queued audio"): 10})
+    kept = record("Queued audio: a.pcm")
+    assert sampling.filter(kept)
+    assert json.loads(JsonFormatter().format(kept))["sampled_every"] == 10
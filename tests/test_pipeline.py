@@ -0,0 +1,90 @@
+import asyncio
+import os
+
+from pipeline import DROPPED, Pipeline, put_drop_oldest
+
+
+class StubDB:
+    """Upserts return a stable id per title; active incidents seed the pipeline."""
+
+    def __init__(self, active=()):
+        self.active = list(active)
+
+    def upsert_incident(self, provider_name, title, **fields):
+        return f"id-{title}"
+
+    def get_active_incidents(self):
+        return self.active
+
+
+def incident(title="EC2 errors", status="Active", severity="major"):
+    return {"service": "AWS", "title": title, "status": status, "severity": severity,
+            "url": None, "raw_text": "", "detected_at": 0.0}
+
+
+def persist_all(pipeline, incidents):
+    """Runs _persist for each incident; returns the titles/statuses passed on to the script stage."""
+    async def run():
+        pipeline.queues["script"] = asyncio.Queue()
+        await pipeline._load_incident_state()
+        for item in incidents:
+            await pipeline._persist(item)
+        scripted = []
+        while not pipeline.queues["script"].empty():
+            update = pipeline.queues["script"].get_nowait()
+            scripted.append((update["title"], update["status"]))
+        return scripted
+
+    return asyncio.run(run())
+
+
+def test_unchanged_incident_is_not_scripted_again():
+    assert persist_all(Pipeline(StubDB()), [incident(), incident()]) == [("EC2 errors", "Active")]
+
+
+def test_status_change_is_scripted():
+    scripted = persist_all(Pipeline(StubDB()), [incident(), incident(status="Resolved")])
+    assert scripted == [("EC2 errors", "Active"), ("EC2 errors", "Resolved")]
+
+
+def test_incident_resolved_on_first_sight_is_skipped():
+    assert persist_all(Pipeline(StubDB()), [incident(status="Resolved")]) == []
+
+
+def test_known_incidents_are_not_reannounced_after_restart():
+    db = StubDB(active=[{"id": "id-EC2 errors", "status": "Active", "severity": "major"}])
+    assert persist_all(Pipeline(db), [incident()]) == []
+
+
+def test_full_queue_drops_oldest_and_removes_its_clip(tmp_path):
+    clips = []
+    for i in range(3):
+        clip = tmp_path / f"alert_{i}.pcm"
+        clip.write_bytes(b"\x00")
+        clips.append(str(clip))
+    dropped_before = DROPPED.labels("play").value
+
+    async def run():
+        queue = asyncio.Queue(maxsize=2)
+        for i, clip in enumerate(clips):
+            put_drop_oldest(queue, {"title": f"alert {i}", "audio_path": clip}, "play")
+        return [queue.get_nowait()["title"] for _ in range(queue.qsize())]
+
+    assert asyncio.run(run()) == ["alert 1", "alert 2"]
+    assert not os.path.exists(clips[0])
+    assert all(os.path.exists(clip) for clip in clips[1:])
+    assert DROPPED.labels("play").value == dropped_before + 1
+
+
+def test_only_published_announcements_reach_the_hub():
+    from fanout import EventHub
+
+    hub = EventHub()
+    pipeline = Pipeline(StubDB(), hub=hub)
+
+    async def run():
+        await pipeline.announce("Maintenance at noon.", source="producer")
+        await pipeline.announce("Service outage detected for GitHub.", source="producer", publish=False)
+
+    asyncio.run(run())
+    assert [(event["type"], event["caption"]) for event in hub.since(0)] == [("MANUAL_ANNOUNCE", "Maintenance at noon.")]
@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+from db_manager import DBManager
+from producer_consumer import ProducerEventConsumer
+from standins import LocalSupabase
+
+
+class RecordingPipeline:
+    """Records what the consumer asks of the pipeline."""
+
+    internet_status = "stable"
+
+    def __init__(self):
+        self.announcements = []
+        self.published = []
+        self.statuses = []
+
+    async def announce(self, text, source="manual", publish=True):
+        self.announcements.append(text)
+        if publish:
+            self.published.append(text)
+
+    def set_internet_status(self, status):
+        self.statuses.append(status)
+
+
+@pytest.fixture
+def supabase():
+    return LocalSupabase()
+
+
+@pytest.fixture
+def cursor_path(tmp_path):
+    return str(tmp_path / "producer_cursor.json")
+
+
+def add_event(supabase, event_type, payload, created_at):
+    supabase.table("producer_events").insert({"type": event_type, "payload": payload, "created_at": created_at}).execute()
+
+
+def consume(consumer, pipeline):
+    return asyncio.run(consumer.consume_once(pipeline))
+
+
+def test_first_start_begins_at_newest_event(supabase, cursor_path):
+    add_event(supabase, "ANNOUNCE", {"message": "old one"}, "2026-01-01T00:00:01+00:00")
+    add_event(supabase, "ANNOUNCE", {"message": "old two"}, "2026-01-01T00:00:02+00:00")
+    consumer = ProducerEventConsumer(DBManager(client=supabase), cursor_path=cursor_path)
+    pipeline = RecordingPipeline()
+
+    assert consume(consumer, pipeline) == 0
+
+    add_event(supabase, "ANNOUNCE", {"message": "fresh"}, "2026-01-01T00:00:03+00:00")
+    assert consume(consumer, pipeline) == 1
+    assert pipeline.announcements == ["fresh"]
+    assert pipeline.published == ["fresh"]
+
+
+def test_skips_ids_already_handled_at_cursor_timestamp(supabase, cursor_path):
+    consumer = ProducerEventConsumer(DBManager(client=supabase), cursor_path=cursor_path)
+    pipeline = RecordingPipeline()
+    add_event(supabase, "ANNOUNCE", {"message": "first"}, "2026-01-01T00:00:05+00:00")
+    assert consume(consumer, pipeline) == 1
+
+    # Same timestamp as the cursor: the boundary row comes back from the query but is not redone
+    add_event(supabase, "ANNOUNCE", {"message": "second"}, "2026-01-01T00:00:05+00:00")
+    assert consume(consumer, pipeline) == 1
+    assert consume(consumer, pipeline) == 0
+    assert pipeline.announcements == ["first", "second"]
+
+
+def test_restart_resumes_from_saved_cursor(supabase, cursor_path):
+    db = DBManager(client=supabase)
+    first = ProducerEventConsumer(db, cursor_path=cursor_path)
+    add_event(supabase, "ANNOUNCE", {"message": "before restart"}, "2026-01-01T00:00:01+00:00")
+    add_event(supabase, "CONTEXT_SET", {"status": "unstable"}, "2026-01-01T00:00:02+00:00")
+    assert consume(first, RecordingPipeline()) == 2
+
+    add_event(supabase, "ANNOUNCE", {"message": "while down"}, "2026-01-01T00:00:03+00:00")
+    pipeline = RecordingPipeline()
+    restarted = ProducerEventConsumer(db, cursor_path=cursor_path)
+    assert consume(restarted, pipeline) == 1
+    assert pipeline.announcements == ["while down"]
+    assert pipeline.statuses == []
+
+
+def test_unknown_event_types_are_ignored(supabase, cursor_path):
+    consumer = ProducerEventConsumer(DBManager(client=supabase), cursor_path=cursor_path)
+    pipeline = RecordingPipeline()
+    add_event(supabase, "REBOOT_EVERYTHING", {}, "2026-01-01T00:00:01+00:00")
+    add_event(supabase, "RESOLVE", {"title": "API latency"}, "2026-01-01T00:00:02+00:00")
+
+    assert consume(consumer, pipeline) == 2
+    assert pipeline.announcements == ["Service restored. API latency."]
+    assert pipeline.statuses == []
+    # Skipped, not retried on the next poll
+    assert consume(consumer, pipeline) == 0
+
+
+def test_sim_outage_names_the_provider(cursor_path):
+    supabase = LocalSupabase(providers=["GitHub"])
+    provider_id = supabase.tables["providers"][0]["id"]
+    consumer = ProducerEventConsumer(DBManager(client=supabase), cursor_path=cursor_path)
+    pipeline = RecordingPipeline()
+    add_event(supabase, "SIM_OUTAGE", {"provider_id": provider_id, "title": "Git operations failing"}, "2026-01-01T00:00:01+00:00")
+    add_event(supabase, "SIM_OUTAGE", {"provider_id": "no-such-provider", "title": "Mystery"}, "2026-01-01T00:00:02+00:00")
+
+    consume(consumer, pipeline)
+
+    assert pipeline.announcements[0].startswith("Service outage detected for GitHub. Git operations failing.")
+    assert pipeline.announcements[1].startswith("Service outage detected for a monitored service. Mystery.")
+    # Dashboards get the incident from the watcher, not as a manual announcement
+    assert pipeline.published == []
@@ -0,0 +1,48 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from replay import check_regressions
+
+REPLAY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../benchmarks/replay.py")
+
+BASELINE = {"alerts_per_s": 4.0, "latency_p95_s": 1.0, "python_peak_mb": 10.0}
+
+
+def test_within_tolerance_passes():
+    results = {"alerts_per_s": 3.5, "latency_p95_s": 1.1, "python_peak_mb": 11.0}
+    assert check_regressions(results, BASELINE, tolerance=0.2) == []
+
+
+def test_regressions_against_baseline_are_reported():
+    results = {"alerts_per_s": 2.0, "latency_p95_s": 1.5, "python_peak_mb": 10.0}
+    problems = check_regressions(results, BASELINE, tolerance=0.2)
+    assert len(problems) == 2
+    assert "throughput" in problems[0]
+    assert "p95 latency" in problems[1]
+
+
+def test_max_p95_applies_without_baseline():
+    assert check_regressions({"latency_p95_s": 2.5}, max_p95=2.0)
+    assert not check_regressions({"latency_p95_s": 1.5}, max_p95=2.0)
+
+
+def test_replay_smoke(tmp_path):
+    pytest.importorskip("feedparser")
+    pytest.importorskip("requests")
+    output = tmp_path / "results.json"
+
+    result = subprocess.run(
+        [sys.executable, REPLAY, "--duration", "2", "--poll-interval", "0.5", "--feeds", "2",
+         "--http-latency", "0", "--db-latency", "0", "--tts-latency", "0.01",
+         "--max-p95", "30", "--output", str(output)],
+        capture_output=True, text=True, timeout=60
+    )
+
+    assert result.returncode == 0, result.stdout + result.stderr
+    results = json.loads(output.read_text())
+    assert results["alerts_announced"] > 0
+    assert results["duration_s"] < 3
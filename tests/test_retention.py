@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta, timezone
+
+from db_manager import DBManager
+from retention import EventCompactor
+from standins import LocalSupabase
+
+
+class StubDB:
+    """compact_events() removes up to batch_size of `backlog` events per call."""
+
+    def __init__(self, backlog):
+        self.backlog = backlog
+        self.calls = []
+
+    def compact_events(self, retention_days, batch_size):
+        self.calls.append((retention_days, batch_size))
+        removed = min(batch_size, self.backlog)
+        self.backlog -= removed
+        return removed
+
+
+def test_stops_on_short_batch():
+    db = StubDB(backlog=250)
+    assert EventCompactor(db, retention_days=3, batch_size=100).compact_once() == 250
+    assert db.calls == [(3, 100)] * 3
+
+
+def test_exact_multiple_needs_one_empty_batch():
+    db = StubDB(backlog=200)
+    assert EventCompactor(db, batch_size=100).compact_once() == 200
+    assert len(db.calls) == 3
+
+
+def test_caps_at_max_batches():
+    db = StubDB(backlog=1000)
+    assert EventCompactor(db, batch_size=100, max_batches=4).compact_once() == 400
+    assert len(db.calls) == 4
+    assert db.backlog == 600
+
+
+def test_nothing_to_compact():
+    db = StubDB(backlog=0)
+    assert EventCompactor(db).compact_once() == 0
+    assert len(db.calls) == 1
+
+
+def days_ago(days):
+    return (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+
+
+def test_compacts_through_dbmanager_rpc():
+    supabase = LocalSupabase()
+    events = supabase.tables["incident_events"]
+    events.extend([
+        {"id": "e1", "incident_id": "i1", "event_type": "alert", "description": "first", "created_at": days_ago(10)},
+        {"id": "e2", "incident_id": "i1", "event_type": "update", "description": "second", "created_at": days_ago(9)},
+        {"id": "e3", "incident_id": "i1", "event_type": "alert", "description": "recent", "created_at": days_ago(1)},
+    ])
+
+    removed = EventCompactor(DBManager(client=supabase), retention_days=7, batch_size=1).compact_once()
+
+    assert removed == 2
+    assert [event["id"] for event in supabase.tables["incident_events"]] == ["e3"]
+    [summary] = supabase.tables["incident_event_summaries"]
+    assert (summary["event_count"], summary["alert_count"], summary["last_description"]) == (2, 1, "second")
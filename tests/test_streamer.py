@@ -0,0 +1,90 @@
+import io
+import os
+
+import pytest
+
+import streamer
+
+
+@pytest.mark.skipif(not os.path.exists("/dev/full"), reason="needs /dev/full")
+def test_pump_keeps_draining_when_log_write_fails():
+    progress = b"frame=  50 fps= 25 q=28.0 size=  512kB time=00:00:02.00 bitrate=2097.2kbits/s speed=1.27x\r"
+    stderr = io.BufferedReader(io.BytesIO(b"ffmpeg banner\n" + progress * 2000))
+
+    # /dev/full fails every write with ENOSPC
+    streamer._pump_ffmpeg_log(stderr, "/dev/full")
+
+    assert stderr.read() == b""
+    assert streamer.FFMPEG_SPEED.value == 1.27
+    assert streamer.FFMPEG_FPS.value == 25.0
+
+
+def test_logged_command_masks_stream_key():
+    cmd = ["ffmpeg", "-f", "tee", "[f=flv:onfail=ignore]rtmp://a.rtmp.youtube.com/live2/abcd-1234|[f=mp4]archive.mp4"]
+
+    shown = streamer._redact(cmd, "abcd-1234")
+
+    assert "abcd-1234" not in shown
+    assert "rtmp://a.rtmp.youtube.com/live2/<stream key>" in shown
+
+
+YOUTUBE = {"youtube_stream_url": "rtmp://a.rtmp.youtube.com/live2", "youtube_stream_key": "abcd-1234"}
+
+
+def test_single_sink_skips_tee():
+    assert streamer.build_output_args(["archive/stream.mp4"]) == [
+        "-f", "mp4", "-movflags", "+frag_keyframe+empty_moov", "archive/stream.mp4"
+    ]
+
+
+def test_tee_picks_muxer_per_sink():
+    sinks = streamer.resolve_sinks(["youtube", "archive/stream.mp4", "srt://relay:9000", "preview.flv"], None, YOUTUBE)
+
+    args = streamer.build_output_args(sinks)
+
+    assert args[:6] == ["-flags", "+global_header", "-f", "tee", "-use_fifo", "1"]
+    assert args[6].split("|") == [
+        "[f=flv:onfail=ignore]rtmp://a.rtmp.youtube.com/live2/abcd-1234",
+        "[f=mp4:movflags=+frag_keyframe+empty_moov:onfail=ignore]archive/stream.mp4",
+        "[f=mpegts:onfail=ignore]srt://relay:9000",
+        "[f=flv:onfail=ignore]preview.flv",
+    ]
+
+
+def test_tee_escapes_separators_in_targets():
+    args = streamer.build_output_args(["clips/a|b [1].mp4", "preview.flv"])
+
+    assert args[-1] == (
+        "[f=mp4:movflags=+frag_keyframe+empty_moov:onfail=ignore]clips/a\\|b \\[1\\].mp4"
+        "|[f=flv:onfail=ignore]preview.flv"
+    )
+
+
+@pytest.mark.parametrize("config", [{}, {"youtube_stream_key": "YOUR_YOUTUBE_STREAM_KEY"}])
+def test_youtube_without_key_is_rejected(config):
+    assert streamer.resolve_sinks(["youtube", "archive.mp4"], None, config) is None
+
+
+def test_unknown_scheme_is_rejected():
+    assert streamer.resolve_sinks(["gopher://example.com/live"], None, YOUTUBE) is None
+
+
+def test_defaults_to_local_output_then_youtube():
+    assert streamer.resolve_sinks(None, "dry_run.mp4", {}) == ["dry_run.mp4"]
+    assert streamer.resolve_sinks(None, None, YOUTUBE) == ["rtmp://a.rtmp.youtube.com/live2/abcd-1234"]
+
+
+def test_dry_run_never_resolves_to_rtmp():
+    stream_config = {"outputs": ["youtube", "archive.mp4"]}
+
+    outputs = streamer.choose_outputs(None, "dry_run.mp4", stream_config)
+    sinks = streamer.resolve_sinks(outputs, "dry_run.mp4", YOUTUBE)
+
+    assert sinks == ["dry_run.mp4"]
+    assert not any(sink.startswith(("rtmp://", "rtmps://")) for sink in sinks)
+
+
+def test_configured_outputs_apply_without_flags():
+    stream_config = {"outputs": ["youtube", "archive.mp4"]}
+    assert streamer.choose_outputs(None, None, stream_config) == ["youtube", "archive.mp4"]
+    assert streamer.choose_outputs(["preview.flv"], None, stream_config) == ["preview.flv"]
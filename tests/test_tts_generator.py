@@ -0,0 +1,47 @@
+import json
+import os
+import sys
+
+import pytest
+
+import config
+import tts_generator
+from standins import FakeOpenAI
+
+
+@pytest.fixture
+def openai(tmp_path, monkeypatch):
+    api_path = tmp_path / "api_config.json"
+    api_path.write_text(json.dumps({"openai_api_key": "sk-local-standin"}))
+    stream_path = tmp_path / "stream_config.json"
+    stream_path.write_text(json.dumps({"tts_enabled": True}))
+    monkeypatch.setattr(config, "api_config", config.ConfigFile(str(api_path), schema=config.API_SCHEMA))
+    monkeypatch.setattr(config, "stream_config", config.ConfigFile(str(stream_path), schema=config.STREAM_SCHEMA))
+    monkeypatch.setattr(tts_generator, "TTS_CACHE_DIR", str(tmp_path / "tts_cache"))
+
+    fake = FakeOpenAI(latency=0.0, seconds_of_audio=0.1)
+    monkeypatch.setitem(sys.modules, "openai", fake)
+    return fake
+
+
+def test_repeated_script_is_served_from_cache(openai, tmp_path):
+    first = tts_generator.generate_tts("AWS is down.", str(tmp_path / "a.pcm"))
+    second = tts_generator.generate_tts("AWS is down.", str(tmp_path / "b.pcm"))
+
+    assert openai.calls == 1
+    with open(first, "rb") as a, open(second, "rb") as b:
+        assert a.read() == b.read()
+
+
+def test_failed_cache_write_leaves_no_entry(openai, tmp_path, monkeypatch):
+    def crash(src, dst):
+        raise OSError("simulated crash before rename")
+
+    with monkeypatch.context() as m:
+        m.setattr(tts_generator.os, "replace", crash)
+        assert tts_generator.generate_tts("GitHub is down.", str(tmp_path / "a.pcm"))
+
+    assert os.listdir(tts_generator.TTS_CACHE_DIR) == []
+    # Not a hit: the next request goes back to the API
+    tts_generator.generate_tts("GitHub is down.", str(tmp_path / "b.pcm"))
+    assert openai.calls == 2
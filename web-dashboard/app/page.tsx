@@ -4,6 +4,7 @@ import { useEffect, useMemo, useState } from "react";
 import { motion } from "framer-motion";
 import { createClient } from "@/src/lib/realtimeClient";
 import { classifyEvent } from "@/src/lib/classifyEvent";
+import { getFanoutUrl, subscribeFanout } from "@/src/lib/fanoutClient";
 import { useEventDirector } from "@/src/lib/useEventDirector";
 import { mapIncidentRow, Incident, SupabaseIncidentRow } from "@/src/lib/mappers";
 import dynamic from 'next/dynamic';
@@ -32,6 +33,7 @@ function StatusBadge({ s }: { s: Incident["severity"] }) {
 
 export default function Page() {
   const supabase = useMemo(() => createClient(), []);
+  const fanoutUrl = useMemo(() => getFanoutUrl(), []);
   const [incidents, setIncidents] = useState<Incident[]>([]);
 
   // Event Director - centralized choreography
@@ -39,8 +41,10 @@ export default function Page() {
     displayDurationMs: 8000,
   });
 
-  // Initial data load
+  // Initial data load (the fanout stream sends its own snapshot)
   useEffect(() => {
+    if (fanoutUrl) return;
+
     async function fetchIncidents() {
       const { data } = await supabase
         .from('incidents')
@@ -57,10 +61,37 @@ export default function Page() {
     }
 
     fetchIncidents();
-  }, [supabase]);
+  }, [supabase, fanoutUrl]);
+
+  // Bot-published event stream: snapshot + pre-classified deltas, no per-viewer DB load
+  useEffect(() => {
+    if (!fanoutUrl) return;
+
+    return subscribeFanout(fanoutUrl, {
+      onSnapshot: (snapshot) => {
+        setIncidents(snapshot.incidents.map(mapIncidentRow));
+      },
+      onEvent: (evt) => {
+        const row = evt.incident;
+        if (row) {
+          const mapped = mapIncidentRow(row);
+          setIncidents((prev) => {
+            const idx = prev.findIndex((x) => x.id === row.id);
+            if (idx === -1) return [mapped, ...prev];
+            const next = [...prev];
+            next[idx] = mapped;
+            return next;
+          });
+        }
+        director.enqueue(evt);
+      },
+    });
+  }, [fanoutUrl, director]);
 
   // Centralized realtime subscriptions (SINGLE SOURCE OF TRUTH)
   useEffect(() => {
+    if (fanoutUrl) return;
+
     // 1. Incidents channel
     const incidentsChannel = supabase
       .channel('realtime-incidents')
@@ -118,7 +149,7 @@ export default function Page() {
       supabase.removeChannel(producerEventsChannel);
       supabase.removeChannel(internetChannel);
     };
-  }, [supabase, director]);
+  }, [supabase, director, fanoutUrl]);
 
   const activeCounts = useMemo(() => {
     const bad = incidents.filter(i => i.severity === "bad").length;
@@ -0,0 +1,41 @@
+import { NormalizedEvent } from '@/src/types/realtime';
+import { SupabaseIncidentRow } from '@/src/lib/mappers';
+
+// Pre-classified event stream published by the Python bot (src/fanout.py).
+// One bot-side DB subscription serves every dashboard connected here.
+
+export type FanoutSnapshot = {
+    seq: number;
+    incidents: SupabaseIncidentRow[];
+    internet_status: string;
+};
+
+export type FanoutEvent = NormalizedEvent & {
+    seq: number;
+    incident?: SupabaseIncidentRow;
+};
+
+type FanoutHandlers = {
+    onSnapshot: (snapshot: FanoutSnapshot) => void;
+    onEvent: (event: FanoutEvent) => void;
+};
+
+export function getFanoutUrl(): string | null {
+    return process.env.NEXT_PUBLIC_FANOUT_URL || null;
+}
+
+export function subscribeFanout(baseUrl: string, handlers: FanoutHandlers): () => void {
+    // EventSource reconnects on its own and sends Last-Event-ID (our sequence
+    // number), so the server replays only the missed deltas, or a fresh
+    // snapshot if we fell too far behind.
+    const source = new EventSource(`${baseUrl.replace(/\/$/, '')}/events`);
+
+    source.addEventListener('snapshot', (msg) => {
+        handlers.onSnapshot(JSON.parse((msg as MessageEvent).data));
+    });
+    source.addEventListener('delta', (msg) => {
+        handlers.onEvent(JSON.parse((msg as MessageEvent).data));
+    });
+
+    return () => source.close();
+}